@@ -1,7 +1,7 @@
 from crewai import Agent
 from tools.file_tools import read_file, write_file, list_files
 
-def get_code_gen_agent(llm):
+def get_code_gen_agent(llm, verbose: bool = False):
     """Code generation agent using qwen coder for translating pseudocode to production code."""
     return Agent(
         role="Code Generator",
@@ -10,14 +10,14 @@ def get_code_gen_agent(llm):
         You incorporate best practices for security, error handling, and performance.""",
         llm=llm,
         tools=[],  # No tools needed; content injected in prompt
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
         max_iter=50,
         max_execution_time=1800,
         memory=False
     )
 
-def get_code_ver_agent(llm):
+def get_code_ver_agent(llm, verbose: bool = False):
     """Code verification agent using qwen coder for checking code against pseudocode."""
     return Agent(
         role="Code Verifier",
@@ -26,7 +26,7 @@ def get_code_ver_agent(llm):
         You check for syntax, best practices, and implementation fidelity per file.""",
         llm=llm,
         tools=[],  # Remove tools since we're injecting content
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
         max_iter=40,
         max_execution_time=1800,
@@ -1,7 +1,7 @@
 from crewai import Agent
 from tools.file_tools import read_file, write_file, list_files
 
-def get_planner_agent(llm):
+def get_planner_agent(llm, verbose: bool = False):
     """Planner agent for generating the architecture plan and files.json."""
     return Agent(
         role="Senior MERN Stack Architect",
@@ -11,7 +11,7 @@ def get_planner_agent(llm):
         You consider security, scalability, performance, and maintainability in every decision.""",
         llm=llm,
         tools=[],  # No tools needed for pure planning
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
         max_iter=35,
         max_execution_time=1200,
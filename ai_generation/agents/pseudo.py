@@ -1,7 +1,7 @@
 from crewai import Agent
 from tools.file_tools import read_file, write_file, list_files
 
-def get_pseudo_gen_agent(llm):
+def get_pseudo_gen_agent(llm, verbose: bool = False):
     """Pseudocode generation agent using granite for structured pseudocode creation."""
     return Agent(
         role="Pseudocode Generator",
@@ -10,13 +10,13 @@ def get_pseudo_gen_agent(llm):
         You create minimal, structured pseudocode that highlights logic, dependencies, and shared elements accurately.""",
         llm=llm,
         tools=[],  # No tools needed; content injected in prompt
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
         max_iter=50,
         max_execution_time=1800,
         memory=True
     )
-def get_pseudo_ver_agent(llm):
+def get_pseudo_ver_agent(llm, verbose: bool = False):
     """Pseudocode verification agent using granite for holistic checks with batching."""
     return Agent(
         role="Pseudocode Verifier & Auditor",
@@ -25,7 +25,7 @@ def get_pseudo_ver_agent(llm):
         You ensure cross-file dependencies resolve and logic is sound before code generation.""",
         llm=llm,
         tools=[read_file, write_file, list_files],
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
         max_iter=40,
         max_execution_time=1800,
@@ -1,6 +1,6 @@
 from crewai import Agent
 
-def get_sanity_check_agent(llm):
+def get_sanity_check_agent(llm, verbose: bool = False):
     """Sanity check agent for high-level plan validation."""
     return Agent(
         role="Senior Software Architect",
@@ -10,7 +10,7 @@ def get_sanity_check_agent(llm):
         that would lead to non-functional applications.""",
         llm=llm,
         tools=[],
-        verbose=True,
+        verbose=verbose,
         allow_delegation=False,
         max_iter=10,
         max_execution_time=300,
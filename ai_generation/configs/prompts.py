@@ -45,22 +45,34 @@ At the end, output the complete file list as valid JSON with this exact format.
 }}
 """
 
+DEPENDENCY_PROMPT = """
+Based on the plan below, list all necessary npm packages in JSON format.
+
+Output a JSON object with this structure:
+{{
+    "dependencies": ["express", "mongoose", "cors", "etc"],
+    "devDependencies": ["nodemon", "@types/node", "etc"]
+}}
+
+Include only actual package names, no versions.
+
+PLAN CONTENT:
+{plan_content}
+"""
+
 PSEUDO_GEN_PROMPT = """
 You are a senior architect generating structured pseudocode.
 
 STEPS:
-1. Use the following plan content:
-{plan_content}
+1. Read the plan content provided below.
 
-2. Generate concise pseudocode for THIS FILE ONLY: {file_path}
-   Description: {file_desc}
+2. Generate concise pseudocode for ONLY the target file named below.
 
-3. VERIFICATION FEEDBACK (if provided, address these issues):
-{verification_feedback}
+3. If verification feedback is provided below, address those issues.
 
 4. Follow this EXACT format:
 BEGIN FILE
-# File Path: {file_path}
+# File Path: [target file path]
 
 # Imports/Dependencies:
 - Import [variable/class] from [path]
@@ -82,6 +94,55 @@ END FILE
    - If verification feedback is provided, you MUST address those specific issues.
    - Keep it minimal but complete.
    - Output ONLY the pseudocode content.
+
+PLAN CONTENT:
+{plan_content}
+
+TARGET FILE: {file_path}
+Description: {file_desc}
+
+VERIFICATION FEEDBACK (if provided, address these issues):
+{verification_feedback}
+"""
+
+PSEUDO_BATCH_GEN_PROMPT = """
+You are a senior architect generating structured pseudocode.
+
+STEPS:
+1. Read the plan content provided below.
+
+2. Generate concise pseudocode for EACH of the target files listed below, and for no other files.
+
+3. Emit one block per target file, in the order listed, using this EXACT format:
+BEGIN FILE
+# File Path: [exact target file path as listed]
+
+# Imports/Dependencies:
+- Import [variable/class] from [path]
+
+# Main Logic:
+INITIALIZE [variable] as [description]
+IF [condition]: [action]
+
+# Functions/Classes:
+DEFINE FUNCTION [name](parameters): [explanation]
+  [step 1]
+
+# Exports/Outputs:
+EXPORT [what this file exposes]
+END FILE
+
+4. Requirements:
+   - Copy each file path exactly as listed; do not rename or merge files.
+   - Use consistent variable/class names across all files.
+   - Keep each block minimal but complete.
+   - Output ONLY the pseudocode blocks.
+
+PLAN CONTENT:
+{plan_content}
+
+TARGET FILES:
+{file_list}
 """
 
 PSEUDO_VER_PROMPT = """
@@ -90,12 +151,9 @@ You are a QA expert verifying pseudocode consistency.
 CRITICAL: You MUST output ONLY valid JSON, no other text before or after.
 
 STEPS:
-1. Use the provided plan and global summary to understand the project context.
-   Plan: {plan_content}
-   Global Summary: {global_summary_content}
+1. Use the plan and global summary provided below to understand the project context.
 
-2. For these files in the current batch, verify their pseudocode:
-{batch_pseudo_contents}
+2. Verify the pseudocode of every file in the current batch provided below.
 
 3. Verify the following for each file:
    - Logic matches the plan requirements.
@@ -107,22 +165,24 @@ STEPS:
   "file/path/one.js": {{"pass": true, "issues": ""}},
   "file/path/two.js": {{"pass": false, "issues": "The user model is missing the 'email' field as required by the plan."}}
 }}
+
+PLAN:
+{plan_content}
+
+GLOBAL SUMMARY:
+{global_summary_content}
+
+CURRENT BATCH:
+{batch_pseudo_contents}
 """
 
 CODE_GEN_PROMPT = """
 You are a senior developer translating pseudocode to production-ready code.
 
-**PROJECT CONTEXT:**
-This file is part of a larger MERN application with these files:
-{project_context}
-
-**PREVIOUS ATTEMPT ERROR (if retrying):**
-{retry_error}
-
 **CRITICAL INSTRUCTIONS BASED ON FILE TYPE:**
 
 ### IF THE FILE IS `package.json`:
-- Use this pre-approved list of dependencies: {dependency_list}
+- Use the pre-approved list of dependencies given under **Approved Dependencies** below.
 - Determine the latest stable versions for all packages.
 - **Output ONLY the raw, valid JSON content.**
 - **DO NOT wrap the JSON in markdown code fences (```json).**
@@ -144,24 +204,25 @@ This file is part of a larger MERN application with these files:
 - Follow all security and performance best practices.
 - **Output ONLY the raw code for the file.**
 
+**PROJECT CONTEXT:**
+This file is part of a larger MERN application with these files:
+{project_context}
+
+**Approved Dependencies (package.json only):** {dependency_list}
+
 **Pseudocode to Translate:**
 {pseudo_content}
 
 **File Description:** {file_desc}
+
+**PREVIOUS ATTEMPT ERROR (if retrying):**
+{retry_error}
 """
 
 
 CODE_VER_PROMPT = """
 Verify the following generated code against its pseudocode with reasonable flexibility.
 
-FILE: {file_path}
-
-PSEUDOCODE:
-{pseudo_content}
-
-GENERATED CODE:
-{code_content}
-
 CRITICAL VERIFICATION RULES:
 - Core logic and functionality MUST match the pseudocode's intent.
 - For JSON files (like package.json), the content MUST be valid, parseable JSON.
@@ -169,6 +230,14 @@ CRITICAL VERIFICATION RULES:
 - Allow for modern best practices even if they differ slightly from the pseudocode.
 
 Output ONLY: 'PASS' or 'FAIL: [brief, specific reason]'.
+
+FILE: {file_path}
+
+PSEUDOCODE:
+{pseudo_content}
+
+GENERATED CODE:
+{code_content}
 """
 
 
@@ -212,4 +281,23 @@ CRITICAL INSTRUCTIONS:
 5.  The final JSON file list MUST be valid and complete, addressing the validation error.
 
 Output the new, corrected, and complete plan.
-"""
\ No newline at end of file
+"""
+CODE_REGEN_PROMPT = """
+Generate improved code for this file based on the pseudocode and verification feedback below.
+
+CRITICAL INSTRUCTIONS:
+- If this is a JSON file (package.json, etc.): Output ONLY valid JSON, NO JavaScript code, NO comments
+- If this is a JavaScript file: Follow all best practices with proper syntax
+- Address the specific issues mentioned in verification feedback
+- Use modern MERN stack conventions
+- Include proper error handling and validation
+- DO NOT include any explanatory text or comments at the end
+
+Output ONLY the complete code content ready to save directly to the file.
+
+PSEUDOCODE:
+{pseudo_content}
+
+PREVIOUS VERIFICATION ISSUES:
+{verification_issues}
+"""
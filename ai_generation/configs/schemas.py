@@ -0,0 +1,7 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class DependencyList(BaseModel):
+    """npm packages the plan needs, as emitted by structured dependency extraction."""
+    dependencies: List[str] = Field(default_factory=list)
+    devDependencies: List[str] = Field(default_factory=list)
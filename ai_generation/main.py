@@ -1,31 +1,30 @@
 
+import os
 import sys
+import hashlib
 import json
-import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import networkx as nx
 from collections import defaultdict, deque
 from datetime import datetime
+from operator import methodcaller
 from pathlib import Path
 from typing import Dict, Optional, List
 import re
 from tools.file_tools import direct_read_file, direct_write_file, direct_list_files
 
-# Import from submodules based on folder structure
-from agents.planner import get_planner_agent
-from agents.pseudo import get_pseudo_gen_agent, get_pseudo_ver_agent  
-from agents.code import get_code_gen_agent, get_code_ver_agent
-from agents.sanity import get_sanity_check_agent
-
-from crewai import Agent, Task, Crew, Process, LLM
-
 from configs.prompts import (
     PLANNER_PROMPT,
+    DEPENDENCY_PROMPT,
     PSEUDO_GEN_PROMPT,
+    PSEUDO_BATCH_GEN_PROMPT,
     PSEUDO_VER_PROMPT,
     CODE_GEN_PROMPT,
     CODE_VER_PROMPT,
     SANITY_CHECK_PROMPT,
-    PLAN_REGEN_PROMPT
+    PLAN_REGEN_PROMPT,
+    CODE_REGEN_PROMPT
 )
 from utils.file_utils import (
     collect_files,
@@ -33,7 +32,56 @@ from utils.file_utils import (
     validate_file_structure,
     validate_description
 )
-from utils.logger import setup_logger
+from utils.logger import setup_logger, log_timestamp
+from utils.llm_cache import SemanticLLMCache
+
+# CrewAI (and litellm/telemetry behind it) is imported on first generator construction,
+# so the CLI menu can start and exit without paying for it
+Task = Crew = Process = LLM = None
+
+def _load_crewai():
+    """Bind the CrewAI classes used by this module, importing them once."""
+    global Task, Crew, Process, LLM
+    if LLM is None:
+        from crewai import Task, Crew, Process, LLM
+
+# First standalone PASS/FAIL token decides a verdict ("FAIL: password ..." must not read as PASS)
+_VERDICT_RE = re.compile(r'\b(PASS|FAIL)\b', re.IGNORECASE)
+
+# One BEGIN FILE ... END FILE block of a batched pseudocode response
+_PSEUDO_BLOCK_RE = re.compile(
+    r'BEGIN FILE\s*\n\s*# File Path:\s*(?P<path>[^\n]+?)\s*\n.*?END FILE',
+    re.DOTALL
+)
+
+# Imports/Dependencies section of a pseudocode file
+_DEPS_SECTION_RE = re.compile(
+    r'# Imports/Dependencies:(.*?)(# Main Logic:|# Functions/Classes:|# Exports/Outputs:|END FILE|$)',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Supported import styles, compiled once. They are scanned separately because several
+# overlap (the greedy "Import ... from" forms consume a whole line), and a single
+# alternation would hide the imports those matches swallow
+_IMPORT_PATH_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    # import Component from './path' or import Component from 'path'
+    r"import\s+\w+\s+from\s+['\"]([^'\"]*\.js)['\"]",
+    # import { thing } from './path'
+    r"import\s+\{[^}]+\}\s+from\s+['\"]([^'\"]*\.js)['\"]",
+    # const Thing = require('./path')
+    r"require\s*\(\s*['\"]([^'\"]*\.js)['\"]\s*\)",
+    # from './path' (pseudocode style)
+    r"from\s+['\"]([^'\"]*\.js)['\"]",
+    # Import from ./path (pseudocode style)
+    r"Import\s+.*from\s+['\"]([^'\"]*\.js)['\"]",
+    # - Import variable from path (bullet point style)
+    r"-\s*Import\s+.*from\s+([^\s]+\.js)",
+))
+
+def _is_pass_verdict(result_text: str) -> bool:
+    """Return True if the verifier's first verdict token is PASS."""
+    match = _VERDICT_RE.search(result_text)
+    return bool(match) and match.group(1).upper() == "PASS"
 
 class MERNCodeGenerator:
     """MERN code generation system with pseudocode layer and file tracking."""
@@ -60,17 +108,10 @@ class MERNCodeGenerator:
                 agent=self.sanity_check_agent
             )
             
-            crew = Crew(
-                agents=[self.sanity_check_agent],
-                tasks=[task],
-                verbose=True,
-                process=Process.sequential
-            )
-            
-            result = crew.kickoff()
-            result_text = result.raw if hasattr(result, 'raw') else str(result)
+            result_text = self._run_task(self.sanity_check_agent, task)
             
-            if "PASS" in result_text.upper():
+            if _is_pass_verdict(result_text):
+                self._remember_response(self.sanity_check_agent, task, result_text)
                 self._log_to_file("Sanity check PASSED - Project structure is logical")
                 return True
             else:
@@ -148,11 +189,7 @@ class MERNCodeGenerator:
                 self._log_to_file(f"Parsing dependencies for: {file_path}")
                 
                 # Extract imports/dependencies section
-                deps_match = re.search(
-                    r'# Imports/Dependencies:(.*?)(# Main Logic:|# Functions/Classes:|# Exports/Outputs:|END FILE|$)', 
-                    content, 
-                    re.DOTALL | re.IGNORECASE
-                )
+                deps_match = _DEPS_SECTION_RE.search(content)
                 
                 if not deps_match:
                     self._log_to_file(f"No dependencies section found in {file_path}")
@@ -161,29 +198,12 @@ class MERNCodeGenerator:
                 deps_section = deps_match.group(1)
                 self._log_to_file(f"Dependencies section for {file_path}: {deps_section[:100]}...")
                 
-                # Enhanced regex patterns for different import styles
-                import_patterns = [
-                    # import Component from './path' or import Component from 'path'
-                    r"import\s+\w+\s+from\s+['\"]([^'\"]*\.js)['\"]",
-                    # import { thing } from './path'
-                    r"import\s+\{[^}]+\}\s+from\s+['\"]([^'\"]*\.js)['\"]",
-                    # const Thing = require('./path')
-                    r"require\s*\(\s*['\"]([^'\"]*\.js)['\"]\s*\)",
-                    # from './path' (pseudocode style)
-                    r"from\s+['\"]([^'\"]*\.js)['\"]",
-                    # Import from ./path (pseudocode style)
-                    r"Import\s+.*from\s+['\"]([^'\"]*\.js)['\"]",
-                    # - Import variable from path (bullet point style)
-                    r"-\s*Import\s+.*from\s+([^\s]+\.js)",
-                ]
-                
                 found_deps = set()
                 
-                for pattern in import_patterns:
-                    matches = re.findall(pattern, deps_section, re.IGNORECASE)
-                    for match in matches:
+                for pattern in _IMPORT_PATH_RES:
+                    for match in pattern.findall(deps_section):
                         # Clean up the path
-                        clean_path = match.strip().lstrip('./')
+                        clean_path = match.strip().strip('\'"').lstrip('./')
                         if clean_path and clean_path != file_path:  # Don't self-reference
                             found_deps.add(clean_path)
                 
@@ -222,35 +242,27 @@ class MERNCodeGenerator:
         """Extract npm dependencies from plan and create dependencies.json."""
         try:
             dependency_task = Task(
-                description=f"""Based on the following plan, list all necessary npm packages in JSON format.
-                
-                Plan: {plan_content}
-                
-                Output a JSON object with this structure:
-                {{
-                    "dependencies": ["express", "mongoose", "cors", "etc"],
-                    "devDependencies": ["nodemon", "@types/node", "etc"]
-                }}
-                
-                Include only actual package names, no versions.""",
+                description=DEPENDENCY_PROMPT.format(plan_content=plan_content),
                 expected_output="JSON object with dependencies arrays",
                 agent=self.planner_agent
             )
             
-            crew = Crew(
-                agents=[self.planner_agent],
-                tasks=[dependency_task],
-                verbose=True,
-                process=Process.sequential
-            )
-            
-            result = crew.kickoff()
-            deps_content = result.raw if hasattr(result, 'raw') else str(result)
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', deps_content, re.DOTALL)
-            if json_match:
-                deps_data = json.loads(json_match.group(0))
+            # Schema-constrained decoding first; free-form output with JSON extraction as fallback
+            deps_data = None
+            try:
+                # Imported here so pydantic only loads when dependencies are extracted
+                from configs.schemas import DependencyList
+                deps_content = self._run_structured_task(self.planner_agent, dependency_task, DependencyList)
+                deps_data = DependencyList.model_validate_json(deps_content).model_dump()
+            except Exception as e:
+                self._log_to_file(f"Structured dependency extraction unavailable, parsing free-form output: {e}")
+                deps_content = self._run_task(self.planner_agent, dependency_task)
+                json_match = re.search(r'\{.*\}', deps_content, re.DOTALL)
+                if json_match:
+                    deps_data = json.loads(json_match.group(0))
+            
+            if deps_data is not None:
+                self._remember_response(self.planner_agent, dependency_task, deps_content)
                 deps_file_path = str(self.working_dir / "dependencies.json")
                 direct_write_file(deps_file_path, json.dumps(deps_data, indent=2))
                 self._log_to_file(f"Dependencies extracted: {len(deps_data.get('dependencies', []))} deps, {len(deps_data.get('devDependencies', []))} devDeps")
@@ -261,21 +273,61 @@ class MERNCodeGenerator:
             return False
     
     def _load_files_json(self) -> Dict:
-        """Load files.json data safely."""
+        """Load files.json data safely, re-reading the file only when its stat changed."""
         try:
-            with open(self.files_json, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            st = os.stat(self.files_json)
+            stat_key = (st.st_mtime_ns, st.st_size)
+            cached = self._files_json_cache
+            if cached is None or cached[0] != stat_key:
+                with open(self.files_json, 'r', encoding='utf-8') as f:
+                    cached = (stat_key, f.read())
+                self._files_json_cache = cached
+            return json.loads(cached[1])
         except Exception:
             return {"files": {}}
 
+    @staticmethod
+    def _write_text_atomic(path, text: str):
+        """Write text to a sibling temp file and swap it into place so readers never see a partial file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
     def _save_files_json(self, data: Dict):
         """Save files.json data safely."""
         try:
-            with open(self.files_json, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            text = json.dumps(data, indent=2)
+            self._write_text_atomic(self.files_json, text)
+            st = os.stat(self.files_json)
+            self._files_json_cache = ((st.st_mtime_ns, st.st_size), text)
         except Exception as e:
+            self._files_json_cache = None
             self._log_to_file(f"Error saving files.json: {e}")
 
+    def _read_text_cached(self, path: str) -> str:
+        """Read a working file through direct_read_file, reusing the last result while its stat is unchanged."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return direct_read_file(path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        cached = self._text_cache.get(path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        content = direct_read_file(path)
+        if not content.startswith("ERROR:"):
+            self._text_cache[path] = (stat_key, content)
+        return content
+
+    def _update_file_flags(self, path: str, **flags):
+        """Atomically set tracking flags for one file in files.json."""
+        with self._files_json_lock:
+            data = self._load_files_json()
+            if path in data.get('files', {}):
+                data['files'][path].update(flags)
+                self._save_files_json(data)
+
     def _get_unfinished_files(self, phase: str) -> List[Dict]:
         """Get list of unfinished files for a given phase."""
         data = self._load_files_json()
@@ -311,11 +363,7 @@ class MERNCodeGenerator:
                 continue
                 
             # Extract dependencies section
-            deps_match = re.search(
-                r'# Imports/Dependencies:(.*?)(# Main Logic:|# Functions/Classes:|# Exports/Outputs:|END FILE|$)', 
-                content, 
-                re.DOTALL | re.IGNORECASE
-            )
+            deps_match = _DEPS_SECTION_RE.search(content)
             deps = deps_match.group(1).strip() if deps_match else ""
             summaries.append(f"File {file_path}: {deps}")
         
@@ -363,7 +411,7 @@ class MERNCodeGenerator:
     def _batch_files(self, files: List[Dict], batch_size: int = 5, dependency_graph=None) -> List[List[Dict]]:
         """Group files into batches respecting dependency order."""
         
-        self._log_to_file(f"DEBUG: _batch_files called with {len(files)} files")
+        self.logger.debug("_batch_files called with %d files", len(files))
         
         if dependency_graph is None:
             # Fallback to original type-based batching
@@ -400,7 +448,9 @@ class MERNCodeGenerator:
 
     def __init__(self, reasoning_model: str = "ollama/granite3.3:2b-largectx", 
                  coding_model: str = "ollama/qwen2.5-coder:7b-largectx",
-                 outputs_dir: Optional[str] = None, working_dir: Optional[str] = None):
+                 outputs_dir: Optional[str] = None, working_dir: Optional[str] = None,
+                 verbose: bool = False):
+        _load_crewai()
         self.logger = setup_logger(__name__)
         self.reasoning_model = reasoning_model
         self.coding_model = coding_model
@@ -432,15 +482,38 @@ class MERNCodeGenerator:
         # Configuration
         self.max_retries = 3
         self.max_regens_per_file = 5
-        
-        # Initialize LLMs
-        self.reasoning_llm = LLM(model=reasoning_model, temperature=0.0, max_tokens=4000)
-        self.coding_llm = LLM(model=coding_model, temperature=0.05, max_tokens=8000)
+        self.log_flush_threshold = 200
+        self.keep_alive = "30m"
+        self.max_parallel_files = 3
+        # CrewAI console tracing is costly on long runs; WEBIFY_VERBOSE=1 turns it back on
+        self.verbose = verbose or os.environ.get("WEBIFY_VERBOSE") == "1"
+        self.pseudo_gen_batch_size = 3
+        self._log_buf: List[str] = []
+        self._log_lock = threading.Lock()
+        self._files_json_lock = threading.RLock()
+        self._files_json_cache = None
+        self._text_cache: Dict[str, tuple] = {}
+        self._worker_state = threading.local()
+        self._crews: Dict[int, "Crew"] = {}
+        self.manifest: Optional[Dict] = None
+        
+        # Initialize LLMs, sized per role: verdict-only agents get a small output budget
+        self.reasoning_llm = self._create_llm(reasoning_model, 0.0, 4000)
+        self.coding_llm = self._create_llm(coding_model, 0.05, 8000)
+        self.verifier_llm = self._create_llm(coding_model, 0.05, 1000)
+        self.sanity_llm = self._create_llm(reasoning_model, 0.0, 500)
+        
+        # Response cache for deterministic (temperature 0) LLM calls
+        self.llm_cache = SemanticLLMCache(str(self.working_dir / ".cache" / "llm_cache.sqlite3"))
         
         # Initialize log and agents
         self._initialize_log_file()
         self._initialize_agents()
     
+    def _create_llm(self, model: str, temperature: float, max_tokens: int):
+        """Create an LLM; keep_alive keeps the Ollama model and its prompt cache loaded between calls."""
+        return LLM(model=model, temperature=temperature, max_tokens=max_tokens, keep_alive=self.keep_alive)
+
     def _sanitize_path(self, path: str) -> Optional[str]:
         """Sanitize file path by removing invalid characters."""
         if not path:
@@ -462,31 +535,176 @@ class MERNCodeGenerator:
                 f.write(f"MERN Code Generation Log - Started at {datetime.now()}\n")
                 f.write("="*60 + "\n\n")
         except Exception as e:
-            print(f"Warning: Could not initialize log file: {e}")
+            self.logger.warning(f"Could not initialize log file: {e}")
 
     def _initialize_agents(self):
         """Initialize all agents."""
+        # Import from submodules based on folder structure
+        from agents.planner import get_planner_agent
+        from agents.pseudo import get_pseudo_gen_agent, get_pseudo_ver_agent
+        from agents.code import get_code_gen_agent, get_code_ver_agent
+        from agents.sanity import get_sanity_check_agent
+        
         try:
-            self.planner_agent = get_planner_agent(self.reasoning_llm)
-            self.pseudo_gen_agent = get_pseudo_gen_agent(self.reasoning_llm)
-            self.pseudo_ver_agent = get_pseudo_ver_agent(self.reasoning_llm)
-            self.code_gen_agent = get_code_gen_agent(self.coding_llm)
-            self.code_ver_agent = get_code_ver_agent(self.coding_llm)
-            self.sanity_check_agent = get_sanity_check_agent(self.reasoning_llm)
+            self.planner_agent = get_planner_agent(self.reasoning_llm, verbose=self.verbose)
+            self.pseudo_gen_agent = get_pseudo_gen_agent(self.reasoning_llm, verbose=self.verbose)
+            self.pseudo_ver_agent = get_pseudo_ver_agent(self.reasoning_llm, verbose=self.verbose)
+            self.code_gen_agent = get_code_gen_agent(self.coding_llm, verbose=self.verbose)
+            self.code_ver_agent = get_code_ver_agent(self.verifier_llm, verbose=self.verbose)
+            self.sanity_check_agent = get_sanity_check_agent(self.sanity_llm, verbose=self.verbose)
         except Exception as e:
             self.logger.error(f"Failed to initialize agents: {e}")
             raise
     
     def _log_to_file(self, message: str):
-        """Append message to log file with caller info."""
+        """Queue message for the log file with caller info; written out by _flush_log."""
         try:
             # Get the name of the function that called this one
-            caller_name = inspect.stack()[1].function
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - [{caller_name}] - {message}\n")
+            caller_name = sys._getframe(1).f_code.co_name
+            line = f"{log_timestamp()} - [{caller_name}] - {message}\n"
+            with self._log_lock:
+                self._log_buf.append(line)
+                pending = len(self._log_buf)
+            if pending >= self.log_flush_threshold:
+                self._flush_log()
         except Exception:
             pass  # Silent fail for logging
 
+    def _flush_log(self):
+        """Write queued log lines to the log file in a single append."""
+        with self._log_lock:
+            if not self._log_buf:
+                return
+            try:
+                with open(self.log_file, 'a', encoding='utf-8', buffering=1 << 16) as f:
+                    f.writelines(self._log_buf)
+            except Exception:
+                pass  # Silent fail for logging
+            finally:
+                self._log_buf.clear()
+
+    def _is_cacheable(self, agent) -> bool:
+        """Only deterministic (temperature 0) agents have their responses cached."""
+        return getattr(agent.llm, 'temperature', None) == 0
+
+    def _get_crew(self, agent, task):
+        """Return the agent's single-agent crew set up to run task, building it on first use."""
+        # The crew holds a reference to its agent, so the id cannot be reused while cached
+        crew = self._crews.get(id(agent))
+        if crew is None:
+            crew = Crew(
+                agents=[agent],
+                tasks=[task],
+                verbose=self.verbose,
+                process=Process.sequential
+            )
+            self._crews[id(agent)] = crew
+        else:
+            crew.tasks = [task]
+        return crew
+
+    def _run_task(self, agent, task, semantic_text: Optional[str] = None, semantic_scope: str = "") -> str:
+        """
+        Run a single-task crew and return its raw output, serving cache hits without an LLM call.
+        semantic_text (the user input the prompt was rendered from) enables near-duplicate hits
+        among tasks rendered from the same semantic_scope template.
+        """
+        if self._is_cacheable(agent):
+            cached = self.llm_cache.get(agent.llm.model, agent.llm.temperature, task.description,
+                                        semantic_text=semantic_text, semantic_scope=semantic_scope)
+            if cached is not None:
+                self._log_to_file(f"LLM cache hit for {agent.role}")
+                return cached
+        
+        crew = self._get_crew(agent, task)
+        
+        result = crew.kickoff()
+        return result.raw if hasattr(result, 'raw') else str(result)
+
+    def _run_verdict_task(self, agent, task) -> str:
+        """
+        Stream a PASS/FAIL verdict straight from the agent's LLM and stop decoding as soon
+        as it is decided: immediately on PASS, at the end of the reason line on FAIL.
+        Falls back to a regular crew kickoff if streaming is unavailable.
+        """
+        try:
+            import litellm
+
+            llm = agent.llm
+            response = litellm.completion(
+                model=llm.model,
+                messages=[
+                    {"role": "system", "content": f"You are {agent.role}. {agent.backstory}"},
+                    {"role": "user", "content": task.description},
+                ],
+                temperature=llm.temperature,
+                max_tokens=llm.max_tokens,
+                keep_alive=self.keep_alive,
+                stream=True
+            )
+        except Exception as e:
+            self._log_to_file(f"Verdict streaming unavailable, using crew kickoff: {e}")
+            return self._run_task(agent, task)
+
+        result_text = ""
+        try:
+            for chunk in response:
+                # Usage and keep-alive chunks may arrive with no choices at all
+                if not chunk.choices:
+                    continue
+                result_text += getattr(chunk.choices[0].delta, "content", None) or ""
+                match = _VERDICT_RE.search(result_text)
+                # The end of a partial stream counts as a word boundary, so a verdict is only
+                # final once a non-word character follows it ("Pass" may continue as "Passport")
+                if match is None or match.end() >= len(result_text):
+                    continue
+                if match.group(1).upper() == "PASS" or "\n" in result_text[match.end():]:
+                    break
+        finally:
+            # Closing the stream drops the connection, which makes Ollama stop decoding
+            close = getattr(getattr(response, 'completion_stream', None), 'close', None)
+            if close:
+                close()
+        return result_text.strip()
+
+    def _run_structured_task(self, agent, task, schema) -> str:
+        """
+        Run a task directly against the agent's LLM with its output constrained to the
+        JSON schema of a pydantic model, returning the raw JSON text.
+        """
+        if self._is_cacheable(agent):
+            cached = self.llm_cache.get(agent.llm.model, agent.llm.temperature, task.description)
+            if cached is not None:
+                self._log_to_file(f"LLM cache hit for {agent.role}")
+                return cached
+        
+        import litellm
+        
+        llm = agent.llm
+        response = litellm.completion(
+            model=llm.model,
+            messages=[
+                {"role": "system", "content": f"You are {agent.role}. {agent.backstory}"},
+                {"role": "user", "content": task.description},
+            ],
+            temperature=llm.temperature,
+            max_tokens=llm.max_tokens,
+            keep_alive=self.keep_alive,
+            response_format=schema
+        )
+        return (response.choices[0].message.content or "").strip()
+
+    def _remember_response(self, agent, task, response: str,
+                           semantic_text: Optional[str] = None, semantic_scope: str = ""):
+        """Cache a response once the caller has accepted it, so rejected outputs are never replayed."""
+        if not self._is_cacheable(agent):
+            return
+        try:
+            self.llm_cache.set(agent.llm.model, agent.llm.temperature, task.description, response,
+                               semantic_text=semantic_text, semantic_scope=semantic_scope)
+        except Exception as e:
+            self._log_to_file(f"Failed to cache LLM response: {e}")
+
     def _clean_code_content(self, content: str, file_path: str = "") -> str:
         """
         More aggressive cleaning to remove markdown wrappers, explanations, 
@@ -557,9 +775,11 @@ class MERNCodeGenerator:
                         self._regenerate_plan(error_message)
             
             # Phase 2: Pseudocode Generation and Verification Loop
+            self.logger.info("Planning complete, starting pseudocode phase")
             self._execute_pseudo_loop()
             
             # Phase 3: Code Generation and Verification Loop
+            self.logger.info("Pseudocode phase complete, starting code phase")
             self._execute_code_loop()
             
             # Collect and validate final files
@@ -571,8 +791,8 @@ class MERNCodeGenerator:
             if validation_result["warnings"]:
                 self.logger.warning(f"Validation warnings: {validation_result['warnings']}")
             
-            # Create manifest
-            create_file_manifest(files_dict, str(self.outputs_dir / "manifest.json"))
+            # Create manifest (kept so callers can report totals without recomputing them)
+            self.manifest = create_file_manifest(files_dict, str(self.outputs_dir / "manifest.json"))
             
             self.logger.info("Generation completed successfully!")
             return files_dict
@@ -581,6 +801,8 @@ class MERNCodeGenerator:
             self.logger.error(f"Generation failed: {e}")
             self._log_to_file(f"FATAL ERROR: {e}")
             raise
+        finally:
+            self._flush_log()
 
     def _regenerate_plan(self, error_message: str):
         """Regenerate the plan based on validation feedback."""
@@ -602,17 +824,10 @@ class MERNCodeGenerator:
                 agent=self.planner_agent
             )
             
-            crew = Crew(
-                agents=[self.planner_agent], 
-                tasks=[task], 
-                verbose=True, 
-                process=Process.sequential
-            )
-            
-            result = crew.kickoff()
-            new_plan_content = result.raw if hasattr(result, 'raw') else str(result)
+            new_plan_content = self._run_task(self.planner_agent, task)
             
-            direct_write_file(self.plan_file_str, new_plan_content)
+            self._write_text_atomic(self.plan_file_str, new_plan_content)
+            self._remember_response(self.planner_agent, task, new_plan_content)
             self._log_to_file("New plan generated and saved.")
 
             self._extract_and_save_files_json(new_plan_content)
@@ -637,18 +852,14 @@ class MERNCodeGenerator:
                 agent=self.planner_agent
             )
             
-            crew = Crew(
-                agents=[self.planner_agent], 
-                tasks=[task], 
-                verbose=True, 
-                process=Process.sequential
-            )
-            
-            result = crew.kickoff()
-            plan_content = result.raw if hasattr(result, 'raw') else str(result)
+            # Only the description is embedded; the fixed template would make every plan look alike
+            plan_content = self._run_task(self.planner_agent, task,
+                                          semantic_text=description, semantic_scope=PLANNER_PROMPT)
             
             # Save plan
-            direct_write_file(self.plan_file_str, plan_content)
+            self._write_text_atomic(self.plan_file_str, plan_content)
+            self._remember_response(self.planner_agent, task, plan_content,
+                                    semantic_text=description, semantic_scope=PLANNER_PROMPT)
             
             # Extract and save files JSON
             self._extract_and_save_files_json(plan_content)
@@ -890,13 +1101,18 @@ class MERNCodeGenerator:
         unfinished_gen = self._get_unfinished_files('pseudo_gen')
         self._log_to_file(f"Found {len(unfinished_gen)} files needing pseudocode generation")
         
-        for file_info in unfinished_gen:
-            path = file_info['path']
-            desc = file_info.get('description', 'No description')
-            
-            success = self._generate_pseudocode_for_file(path, desc)
-            if not success:
-                self._log_to_file(f"Failed to generate pseudocode for {path} after max retries")
+        batch_size = self.pseudo_gen_batch_size
+        for i in range(0, len(unfinished_gen), batch_size):
+            # One call covers the whole batch; only files it did not cover fall back to per-file generation
+            remaining = self._generate_pseudocode_batch(unfinished_gen[i:i + batch_size])
+            for file_info in remaining:
+                path = file_info['path']
+                desc = file_info.get('description', 'No description')
+                
+                success = self._generate_pseudocode_for_file(path, desc)
+                if not success:
+                    self._log_to_file(f"Failed to generate pseudocode for {path} after max retries")
+            self._flush_log()
             
         
         if self._all_phase_complete('pseudo_gen'):
@@ -925,46 +1141,39 @@ class MERNCodeGenerator:
             
             for batch in batches:
                 self._verify_pseudocode_batch(batch)
+                self._flush_log()
         
         self._log_to_file("Pseudocode loop complete")
+        self._flush_log()
 
     def _generate_pseudocode_for_file(self, path: str, description: str, verification_feedback: str = None) -> bool:
         """Generate pseudocode for a single file."""
         retries = 0
         per_file_regens = 0
         
+        # The plan does not change between retries, so read it and build the prompt once
+        plan_content = self._read_text_cached(self.plan_file_str)
+        if "ERROR" in plan_content:
+            self._log_to_file(f"Failed to read plan for {path}: {plan_content}")
+            return False
+        
+        # Create task with optional feedback
+        task_desc = PSEUDO_GEN_PROMPT.format(
+            plan_content=plan_content,
+            file_path=path,
+            file_desc=description,
+            verification_feedback=verification_feedback or ""  # NEW parameter
+        )
+        
         while retries < self.max_retries and per_file_regens < self.max_regens_per_file:
             try:
-                # Read plan content
-                plan_content = direct_read_file(self.plan_file_str)
-                if "ERROR" in plan_content:
-                    self._log_to_file(f"Failed to read plan for {path}: {plan_content}")
-                    return False
-                
-                # Create task with optional feedback
-                task_desc = PSEUDO_GEN_PROMPT.format(
-                    plan_content=plan_content,
-                    file_path=path,
-                    file_desc=description,
-                    verification_feedback=verification_feedback or ""  # NEW parameter
-                )
-                
-                
                 task = Task(
                     description=task_desc,
                     expected_output="Pseudocode content",
                     agent=self.pseudo_gen_agent
                 )
                 
-                crew = Crew(
-                    agents=[self.pseudo_gen_agent], 
-                    tasks=[task], 
-                    verbose=True, 
-                    process=Process.sequential
-                )
-                
-                result = crew.kickoff()
-                pseudo_content = result.raw if hasattr(result, 'raw') else str(result)
+                pseudo_content = self._run_task(self.pseudo_gen_agent, task)
                 
                 # Validate content
                 if len(pseudo_content.strip()) < 50 or "BEGIN FILE" not in pseudo_content:
@@ -982,6 +1191,8 @@ class MERNCodeGenerator:
                 if "ERROR" in write_result:
                     raise ValueError(f"Failed to write pseudocode: {write_result}")
                 
+                self._remember_response(self.pseudo_gen_agent, task, pseudo_content)
+                
                 # Update tracking
                 data = self._load_files_json()
                 if path in data.get('files', {}):
@@ -998,6 +1209,57 @@ class MERNCodeGenerator:
         
         return False
 
+    def _generate_pseudocode_batch(self, files: List[Dict]) -> List[Dict]:
+        """Generate pseudocode for several files in one LLM call; returns the files that still need it."""
+        if len(files) < 2:
+            return files
+        
+        plan_content = self._read_text_cached(self.plan_file_str)
+        if "ERROR" in plan_content:
+            return files
+        
+        file_list = "\n".join(
+            f"- {f['path']}: {f.get('description', 'No description')}" for f in files
+        )
+        task = Task(
+            description=PSEUDO_BATCH_GEN_PROMPT.format(plan_content=plan_content, file_list=file_list),
+            expected_output="One pseudocode block per target file",
+            agent=self.pseudo_gen_agent
+        )
+        
+        try:
+            response = self._run_task(self.pseudo_gen_agent, task)
+        except Exception as e:
+            self._log_to_file(f"Batched pseudocode generation failed, falling back to per-file: {e}")
+            return files
+        
+        blocks = {}
+        for match in _PSEUDO_BLOCK_RE.finditer(response):
+            blocks[match.group('path').strip('`*\'" ')] = match.group(0)
+        
+        remaining = []
+        for file_info in files:
+            path = file_info['path']
+            pseudo_content = blocks.get(path)
+            clean_path = self._sanitize_path(path)
+            if pseudo_content is None or len(pseudo_content.strip()) < 50 or clean_path is None:
+                remaining.append(file_info)
+                continue
+            
+            write_result = direct_write_file(f"{self.pseudo_dir_str}/{clean_path}.pseudo", pseudo_content)
+            if "ERROR" in write_result:
+                remaining.append(file_info)
+                continue
+            
+            self._update_file_flags(path, is_pseudo_gen=True)
+            self._log_to_file(f"Pseudocode generated for {path} (batched)")
+        
+        if not remaining:
+            self._remember_response(self.pseudo_gen_agent, task, response)
+        else:
+            self._log_to_file(f"Batched pseudocode missing {len(remaining)} of {len(files)} files, falling back to per-file")
+        return remaining
+
     def _create_project_context(self, data: Dict) -> str:
         """Create a summary of all project files for context."""
         files = data.get('files', {})
@@ -1026,20 +1288,25 @@ class MERNCodeGenerator:
         batch_files = [f['path'] for f in batch]
         retries = 0
         
+        plan_content = self._read_text_cached(self.plan_file_str)
+        global_summary_content = self._read_text_cached(str(self.global_summary))
+        
+        # Use more specific error checking
+        if plan_content.startswith("ERROR:"):
+            self._log_to_file(f"Failed to read plan: {plan_content}")
+            return False
+        
         while retries < self.max_retries:
             try:
-                plan_content = direct_read_file(self.plan_file_str)
-                global_summary_content = direct_read_file(str(self.global_summary))
-                
-                # Use more specific error checking
-                if plan_content.startswith("ERROR:"):
-                    raise ValueError(f"Failed to read plan: {plan_content}")
-                
                 batch_pseudo_contents = ""
                 for file_path in batch_files:
                     pseudo_path = self.pseudo_dir / f"{file_path}.pseudo"
                     
-                    if not pseudo_path.exists() or pseudo_path.stat().st_size == 0:
+                    try:
+                        pseudo_size = os.stat(pseudo_path).st_size
+                    except OSError:
+                        pseudo_size = 0
+                    if pseudo_size == 0:
                         self._log_to_file(f"Verification failed: Pseudocode file is missing or empty for {file_path}")
                         data = self._load_files_json()
                         if file_path in data.get('files', {}):
@@ -1047,7 +1314,7 @@ class MERNCodeGenerator:
                         self._save_files_json(data)
                         continue
 
-                    pseudo_content = direct_read_file(str(pseudo_path))
+                    pseudo_content = self._read_text_cached(str(pseudo_path))
                     
                     # Use more specific error checking
                     if pseudo_content.startswith("ERROR:"):
@@ -1066,16 +1333,14 @@ class MERNCodeGenerator:
                 )
                 
                 task = Task(description=task_desc, expected_output="JSON verification results", agent=self.pseudo_ver_agent)
-                crew = Crew(agents=[self.pseudo_ver_agent], tasks=[task], verbose=True)
-                
-                result = crew.kickoff()
-                result_text = result.raw if hasattr(result, 'raw') else str(result)
+                result_text = self._run_task(self.pseudo_ver_agent, task)
                 
                 json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
                 if not json_match:
                     raise ValueError("Verification response did not contain valid JSON.")
                 
                 ver_results = json.loads(json_match.group(0))
+                self._remember_response(self.pseudo_ver_agent, task, result_text)
                 
                 data = self._load_files_json()
                 all_passed = True
@@ -1110,11 +1375,26 @@ class MERNCodeGenerator:
         unfinished_gen = self._get_unfinished_files('code_gen')
         self._log_to_file(f"Found {len(unfinished_gen)} files needing code generation")
         
-        for file_info in unfinished_gen:
-            path = file_info['path']
-            success = self._generate_code_for_file(path)
-            if not success:
-                self._log_to_file(f"Failed to generate code for {path} after max retries")
+        # Files only depend on their own pseudocode here, so generation runs concurrently
+        with ThreadPoolExecutor(max_workers=self.max_parallel_files,
+                                initializer=self._init_code_worker) as executor:
+            futures = {
+                executor.submit(self._generate_code_for_file, file_info['path']): file_info['path']
+                for file_info in unfinished_gen
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    for pending in futures:
+                        pending.cancel()
+                    self._log_to_file(f"Code generation worker crashed for {path}: {e}")
+                    self._flush_log()
+                    raise
+                if not success:
+                    self._log_to_file(f"Failed to generate code for {path} after max retries")
+                self._flush_log()
         
         # Individual verification phase
         unfinished_ver = self._get_unfinished_files('code_ver')
@@ -1125,40 +1405,49 @@ class MERNCodeGenerator:
             success = self._verify_code_file(path)
             if not success:
                 self._log_to_file(f"Failed to verify code for {path} after max retries")
+            self._flush_log()
         
         self._log_to_file("Code loop complete")
+        self._flush_log()
+
+    def _init_code_worker(self):
+        """Give each code generation worker thread its own agent so crews never share executor state."""
+        from agents.code import get_code_gen_agent
+        self._worker_state.code_gen_agent = get_code_gen_agent(self.coding_llm, verbose=self.verbose)
 
     def _generate_code_for_file(self, path: str) -> bool:
         """Generate code for a single file with enhanced context and retry logic."""
+        code_gen_agent = getattr(self._worker_state, 'code_gen_agent', self.code_gen_agent)
         retries = 0
         per_file_regens = 0
         retry_error = ""
         
+        # Inputs that stay fixed across retries are gathered once per file
+        pseudo_path = f"{self.pseudo_dir_str}/{path}.pseudo"
+        pseudo_content = self._read_text_cached(pseudo_path)
+        
+        if pseudo_content.startswith("ERROR:"):
+            self._log_to_file(f"Failed to read pseudocode for {path}: {pseudo_content}")
+            return False
+        
+        # Get file info and project context
+        data = self._load_files_json()
+        file_info = data.get('files', {}).get(path, {})
+        file_desc = file_info.get('description', 'No description available')
+        
+        # Create project context
+        project_context = self._create_project_context(data)
+        
+        # NEW: For package.json, inject dependency list
+        dependency_list = ""
+        if path == "package.json":
+            deps_file = str(self.working_dir / "dependencies.json")
+            deps_content = direct_read_file(deps_file)
+            if "ERROR" not in deps_content:
+                dependency_list = deps_content
+        
         while retries < self.max_retries and per_file_regens < self.max_regens_per_file:
             try:
-                # Read pseudocode
-                pseudo_path = f"{self.pseudo_dir_str}/{path}.pseudo"
-                pseudo_content = direct_read_file(pseudo_path)
-                
-                if pseudo_content.startswith("ERROR:"):
-                    raise ValueError(f"Failed to read pseudocode for {path}: {pseudo_content}")
-                
-                # Get file info and project context
-                data = self._load_files_json()
-                file_info = data.get('files', {}).get(path, {})
-                file_desc = file_info.get('description', 'No description available')
-                
-                # Create project context
-                project_context = self._create_project_context(data)
-                
-                # NEW: For package.json, inject dependency list
-                dependency_list = ""
-                if path == "package.json":
-                    deps_file = str(self.working_dir / "dependencies.json")
-                    deps_content = direct_read_file(deps_file)
-                    if "ERROR" not in deps_content:
-                        dependency_list = deps_content
-                
                 # Create task with enhanced context
                 task = Task(
                     description=CODE_GEN_PROMPT.format(
@@ -1168,19 +1457,11 @@ class MERNCodeGenerator:
                         project_context=project_context,
                         retry_error=retry_error
                     ),
-                    agent=self.code_gen_agent,
+                    agent=code_gen_agent,
                     expected_output="The complete code for the file."
                 )
                 
-                crew = Crew(
-                    agents=[self.code_gen_agent], 
-                    tasks=[task], 
-                    verbose=True, 
-                    process=Process.sequential
-                )
-                
-                result = crew.kickoff()
-                code_content = result.raw if hasattr(result, 'raw') else str(result)
+                code_content = self._run_task(code_gen_agent, task)
                 code_content = self._clean_code_content(code_content, path)
                 
                 # Validate content
@@ -1224,9 +1505,7 @@ class MERNCodeGenerator:
                         raise ValueError(error_msg)
                 
                 # Update tracking
-                if 'files' in data and path in data['files']:
-                    data['files'][path]['is_code_gen'] = True
-                    self._save_files_json(data)
+                self._update_file_flags(path, is_code_gen=True)
                 
                 self._log_to_file(f"Code generated for {path} (attempt {retries + 1})")
                 return True
@@ -1247,31 +1526,16 @@ class MERNCodeGenerator:
         try:
             # Read pseudocode
             pseudo_path = f"{self.pseudo_dir_str}/{file_path}.pseudo"
-            pseudo_content = direct_read_file(pseudo_path)
+            pseudo_content = self._read_text_cached(pseudo_path)
             
             if pseudo_content.startswith("ERROR:"):
                 return False
             
             # Create enhanced task with verification feedback
-            task_desc = f"""
-            Generate improved code for this file based on pseudocode and verification feedback:
-
-            PSEUDOCODE:
-            {pseudo_content}
-
-            PREVIOUS VERIFICATION ISSUES:
-            {verification_issues}
-
-            CRITICAL INSTRUCTIONS:
-            - If this is a JSON file (package.json, etc.): Output ONLY valid JSON, NO JavaScript code, NO comments
-            - If this is a JavaScript file: Follow all best practices with proper syntax
-            - Address the specific issues mentioned in verification feedback
-            - Use modern MERN stack conventions
-            - Include proper error handling and validation
-            - DO NOT include any explanatory text or comments at the end
-
-            Output ONLY the complete code content ready to save directly to the file.
-            """
+            task_desc = CODE_REGEN_PROMPT.format(
+                pseudo_content=pseudo_content,
+                verification_issues=verification_issues
+            )
             
             task = Task(
                 description=task_desc,
@@ -1279,15 +1543,7 @@ class MERNCodeGenerator:
                 agent=self.code_gen_agent
             )
             
-            crew = Crew(
-                agents=[self.code_gen_agent], 
-                tasks=[task], 
-                verbose=True, 
-                process=Process.sequential
-            )
-            
-            result = crew.kickoff()
-            code_content = result.raw if hasattr(result, 'raw') else str(result)
+            code_content = self._run_task(self.code_gen_agent, task)
             code_content = self._clean_code_content(code_content, file_path)
             
             # Validate content
@@ -1313,16 +1569,18 @@ class MERNCodeGenerator:
         """Verify a single code file against its pseudocode."""
         retries = 0
         regen_count = 0
-        max_regens = 5
-        
-        while retries < self.max_retries:
+        max_regens = self.max_regens_per_file
+        failed_digest = None
+        issues = ""
+
+        while True:
             try:
                 # Read both code and pseudocode files
                 code_path = f"{self.outputs_dir_str}/{file_path}"
                 pseudo_path = f"{self.pseudo_dir_str}/{file_path}.pseudo"
                 
                 code_content = direct_read_file(code_path)
-                pseudo_content = direct_read_file(pseudo_path)
+                pseudo_content = self._read_text_cached(pseudo_path)
                 
                 if "ERROR" in code_content:
                     self._log_to_file(f"Code file not found for verification: {file_path}")
@@ -1332,81 +1590,75 @@ class MERNCodeGenerator:
                     self._log_to_file(f"Pseudocode file not found for verification: {file_path}")
                     return False
                 
-                # Create verification task with content injected in prompt
-                task_desc = CODE_VER_PROMPT.format(
-                    file_path=file_path,
-                    pseudo_content=pseudo_content,
-                    code_content=code_content
-                )
-                task = Task(
-                    description=task_desc,
-                    expected_output="PASS or FAIL with reason",
-                    agent=self.code_ver_agent
-                )
-                
-                crew = Crew(
-                    agents=[self.code_ver_agent], 
-                    tasks=[task], 
-                    verbose=True, 
-                    process=Process.sequential
-                )
-                
-                result = crew.kickoff()
-                result_text = result.raw if hasattr(result, 'raw') else str(result)
-                
-                # Parse result
-                if "PASS" in result_text.upper():
-                    # Update tracking
-                    data = self._load_files_json()
-                    if file_path in data.get('files', {}):
-                        data['files'][file_path]['is_code_ver'] = True
-                        # Clear any previous review flags
-                        data['files'][file_path].pop('needs_pseudo_review', None)
-                        data['files'][file_path].pop('verification_issues', None)
-                        self._save_files_json(data)
-                    
-                    self._log_to_file(f"Code verification passed for {file_path}")
-                    return True
+                digest = hashlib.blake2b(code_content.encode('utf-8'), digest_size=16).digest()
+                if digest == failed_digest:
+                    # Regeneration reproduced code that already failed; the verdict would not change
+                    self._log_to_file(f"Regeneration made no changes to {file_path}, skipping re-verification")
                 else:
-                    issues = result_text.replace("FAIL:", "").strip()
-                    self._log_to_file(f"Code verification failed for {file_path}: {issues}")
+                    # Create verification task with content injected in prompt
+                    task_desc = CODE_VER_PROMPT.format(
+                        file_path=file_path,
+                        pseudo_content=pseudo_content,
+                        code_content=code_content
+                    )
+                    task = Task(
+                        description=task_desc,
+                        expected_output="PASS or FAIL with reason",
+                        agent=self.code_ver_agent
+                    )
+                    
+                    result_text = self._run_verdict_task(self.code_ver_agent, task)
                     
-                    # NEW: Mark for pseudocode review if verification fails consistently
-                    if regen_count >= max_regens:
+                    # Parse result
+                    if _is_pass_verdict(result_text):
+                        # Update tracking
                         data = self._load_files_json()
                         if file_path in data.get('files', {}):
-                            data['files'][file_path]['needs_pseudo_review'] = True
-                            data['files'][file_path]['verification_issues'] = issues
-                            # Reset flags to trigger regeneration
-                            data['files'][file_path]['is_pseudo_gen'] = False
-                            data['files'][file_path]['is_pseudo_ver'] = False
-                            data['files'][file_path]['is_code_gen'] = False
+                            data['files'][file_path]['is_code_ver'] = True
+                            # Clear any previous review flags
+                            data['files'][file_path].pop('needs_pseudo_review', None)
+                            data['files'][file_path].pop('verification_issues', None)
                             self._save_files_json(data)
                         
-                        self._log_to_file(f"Marking {file_path} for pseudocode review due to persistent verification failures")
-                        return False
-                    
-                    # Try to regenerate code if within limits
-                    if regen_count < max_regens:
-                        self._log_to_file(f"Attempting to regenerate {file_path} (attempt {regen_count + 1}/{max_regens})")
-                        
-                        success = self._regenerate_code_with_feedback(file_path, issues)
-                        if success:
-                            regen_count += 1
-                            continue
-                        else:
-                            self._log_to_file(f"Failed to regenerate {file_path}")
-                            retries += 1
-                    else:
-                        self._log_to_file(f"Max regeneration attempts reached for {file_path}")
-                        return False
-                            
+                        self._log_to_file(f"Code verification passed for {file_path}")
+                        return True
+
+                    issues = result_text.replace("FAIL:", "").strip()
+                    failed_digest = digest
+                    self._log_to_file(f"Code verification failed for {file_path}: {issues}")
+
+                # Terminal state: regeneration budget spent, hand the file back to the pseudocode loop
+                if regen_count >= max_regens:
+                    data = self._load_files_json()
+                    if file_path in data.get('files', {}):
+                        data['files'][file_path]['needs_pseudo_review'] = True
+                        data['files'][file_path]['verification_issues'] = issues
+                        # Reset flags to trigger regeneration
+                        data['files'][file_path]['is_pseudo_gen'] = False
+                        data['files'][file_path]['is_pseudo_ver'] = False
+                        data['files'][file_path]['is_code_gen'] = False
+                        self._save_files_json(data)
+
+                    self._log_to_file(f"Marking {file_path} for pseudocode review due to persistent verification failures")
+                    return False
+
+                self._log_to_file(f"Attempting to regenerate {file_path} (attempt {regen_count + 1}/{max_regens})")
+                if self._regenerate_code_with_feedback(file_path, issues):
+                    regen_count += 1
+                    continue
+
+                retries += 1
+                if retries >= self.max_retries:
+                    self._log_to_file(f"Failed to regenerate {file_path}, max retries reached")
+                    return False
+                self._log_to_file(f"Failed to regenerate {file_path}")
+
             except Exception as e:
-                self._log_to_file(f"Error verifying code for {file_path}: {e}")
                 retries += 1
-        
-        self._log_to_file(f"Max retries reached for code verification of {file_path}")
-        return False
+                if retries >= self.max_retries:
+                    self._log_to_file(f"Error verifying code for {file_path}: {e} (max retries reached)")
+                    return False
+                self._log_to_file(f"Error verifying code for {file_path}: {e}")
 
                     
 
@@ -1475,13 +1727,18 @@ class MERNCodeGenerator:
         try:
             data = self._load_files_json()
             files = data.get('files', {})
+            infos = list(files.values())
+            
+            # map/methodcaller keeps the per-file flag lookups in C; bool() guards non-bool flags
+            def count(flag: str) -> int:
+                return sum(map(bool, map(methodcaller('get', flag, False), infos)))
             
             status = {
                 'total_files': len(files),
-                'pseudo_gen_complete': sum(1 for f in files.values() if f.get('is_pseudo_gen', False)),
-                'pseudo_ver_complete': sum(1 for f in files.values() if f.get('is_pseudo_ver', False)),
-                'code_gen_complete': sum(1 for f in files.values() if f.get('is_code_gen', False)),
-                'code_ver_complete': sum(1 for f in files.values() if f.get('is_code_ver', False)),
+                'pseudo_gen_complete': count('is_pseudo_gen'),
+                'pseudo_ver_complete': count('is_pseudo_ver'),
+                'code_gen_complete': count('is_code_gen'),
+                'code_ver_complete': count('is_code_ver'),
                 'files': files
             }
             
@@ -1562,6 +1819,7 @@ Include admin panel, content management, automated backups, and comprehensive de
         print("❌ Invalid choice. Using calculator sample.")
         description = sample_descriptions["calculator"]
     
+    generator = None
     try:
         generator = MERNCodeGenerator()
         files_dict = generator.generate_mern_code(description)
@@ -1572,7 +1830,7 @@ Include admin panel, content management, automated backups, and comprehensive de
         print("="*60)
         
         print(f"\n📊 Generation Summary:")
-        manifest = create_file_manifest(files_dict, str(generator.outputs_dir / "manifest.json"))
+        manifest = generator.manifest
         print(f"  Total files: {manifest['total_files']}")
         print(f"  Total lines: {manifest['total_lines']}")
         print(f"  Total size: {manifest['total_size_bytes']} bytes")
@@ -1595,6 +1853,9 @@ Include admin panel, content management, automated backups, and comprehensive de
         print(f"\n❌ Generation failed: {e}")
         print("Check the log file for detailed error information.")
         sys.exit(1)
+    finally:
+        if generator is not None:
+            generator.llm_cache.close()
 
 if __name__ == "__main__":
     main()
@@ -1,69 +1,192 @@
-import base64
-from crewai.tools import tool
+import os
+import json
+import re
+import stat
 from pathlib import Path
-from datetime import datetime
+from utils.file_utils import invalidate_collected_file, read_file_bytes
+from utils.logger import log_timestamp
 
-@tool("read_file")
-def read_file(path: str) -> str:
+# pybase64 uses SIMD codecs; fall back to the stdlib when it is not installed
+try:
+    from pybase64 import b64encode, b64decode
+except ImportError:
+    from base64 import b64encode, b64decode
+
+# orjson parses in C with SIMD string scanning; only used to validate JSON before writing
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Multiples of 3 raw bytes / 4 base64 chars, so chunks encode and decode independently
+_ENCODE_CHUNK = 3 * 65536
+_DECODE_CHUNK = 4 * 65536
+_WHITESPACE_RE = re.compile(r'\s')
+
+
+_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'})
+# File types that may legitimately be shorter than the truncation guard
+_SHORT_OK = frozenset({'.json', '.log', '.env', '.gitignore', '.md', '.txt'})
+
+_SNIFF_BYTES = 8192
+_UTF16_BOMS = (b'\xff\xfe', b'\xfe\xff')
+
+
+# Windows paths accept either separator natively; elsewhere backslashes (e.g. from LLM
+# output) must become '/' to be treated as separators
+_NEEDS_SEP_NORMALIZE = os.sep != '\\'
+
+
+def _normalize_sep(path: str) -> str:
+    """Convert backslash separators only where the platform needs it and the path has any."""
+    if _NEEDS_SEP_NORMALIZE and '\\' in path:
+        return path.replace('\\', '/')
+    return path
+
+
+# Parent directories already created (or seen to exist) by this process
+_KNOWN_DIRS = set()
+
+
+def _ensure_parent(path_obj: Path):
+    """Create the parent directory of path_obj unless this process already did."""
+    parent = path_obj.parent
+    key = str(parent)
+    if key in _KNOWN_DIRS:
+        return
+    parent.mkdir(parents=True, exist_ok=True)
+    _KNOWN_DIRS.add(key)
+    _KNOWN_DIRS.update(str(p) for p in parent.parents)
+
+
+def _open_for_write(path_obj: Path, mode: str, **kwargs):
+    """Open for writing; if a cached parent directory was removed meanwhile, recreate it once."""
+    try:
+        return open(path_obj, mode, **kwargs)
+    except FileNotFoundError:
+        _KNOWN_DIRS.clear()
+        _ensure_parent(path_obj)
+        return open(path_obj, mode, **kwargs)
+
+
+def _read_text(path_obj: Path, size: int) -> str:
+    """Read a text file, rejecting binaries by sniffing the head for NUL bytes before decoding."""
+    try:
+        raw = read_file_bytes(path_obj, size)
+    except Exception as e:
+        return f"ERROR: Failed to read file {path_obj}: {str(e)}"
+    
+    # UTF-16 text is full of NULs, so only BOM-less files are sniffed
+    if raw.find(b'\x00', 0, _SNIFF_BYTES) != -1 and not raw.startswith(_UTF16_BOMS):
+        return f"ERROR: File appears to be binary: {path_obj}"
+    
+    # Pick the codec from the BOM instead of trial-decoding: UTF-16 only with a BOM,
+    # otherwise strict UTF-8, and latin1 (which accepts any byte) as the fallback
+    try:
+        if raw.startswith(_UTF16_BOMS):
+            content = raw.decode('utf-16')
+        else:
+            try:
+                content = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                content = raw.decode('latin1')
+    except UnicodeDecodeError:
+        return f"ERROR: Unable to decode file with any supported encoding: {path_obj}"
+    
+    # Match text-mode reads, which translate \r\n and \r to \n
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def _encode_image(path_obj: Path, ext: str, size: int) -> str:
     """
-    Enhanced file reading with comprehensive error handling.
-    Supports text files (UTF-8) and images (base64).
+    Return an image as a data URL. The output length is known from the file size, so the
+    URL is encoded block by block into one preallocated buffer and decoded to str once.
+    """
+    prefix = f"data:image/{ext[1:]};base64,".encode('ascii')
+    out = bytearray(len(prefix) + (size + 2) // 3 * 4)
+    out[:len(prefix)] = prefix
+    pos = len(prefix)
+    block = bytearray(_ENCODE_CHUNK)
+    view = memoryview(block)
+    with open(path_obj, 'rb', buffering=0) as f:
+        while True:
+            # Raw reads may come back short; fill the block completely so only the final
+            # block can have a length that is not a multiple of 3 (and carry '=' padding)
+            n = 0
+            while n < _ENCODE_CHUNK:
+                got = f.readinto(view[n:])
+                if not got:
+                    break
+                n += got
+            if not n:
+                break
+            encoded = b64encode(view[:n])
+            end = pos + len(encoded)
+            # The file may have grown since it was stat'ed; bytearray slices extend as needed
+            out[pos:end] = encoded
+            pos = end
+            if n < _ENCODE_CHUNK:
+                break
+    del out[pos:]
+    return out.decode('ascii')
+
+
+def _decode_image(path_obj: Path, data: str, offset: int = 0):
+    """
+    Decode the base64 payload starting at data[offset:] to a file in slices, so neither the
+    payload string nor the decoded bytes are ever materialized in full.
     """
+    if _WHITESPACE_RE.search(data, offset):
+        # Chunk boundaries must fall on 4-char groups, so drop line breaks up front
+        data = _WHITESPACE_RE.sub('', data[offset:])
+        offset = 0
+    with _open_for_write(path_obj, 'wb', buffering=1 << 20) as f:
+        for start in range(offset, len(data), _DECODE_CHUNK):
+            f.write(b64decode(data[start:start + _DECODE_CHUNK], validate=False))
+
+def _read_file_impl(path: str) -> str:
+    """Shared implementation of read_file and direct_read_file."""
     try:
-        path_obj = Path(path.replace("\\", "/"))
+        path_obj = Path(_normalize_sep(path))
         
-        if not path_obj.exists():
+        # One stat answers existence, type and size
+        try:
+            st = os.stat(path_obj)
+        except FileNotFoundError:
             return f"ERROR: File not found at path: {path_obj}"
         
-        if not path_obj.is_file():
+        if not stat.S_ISREG(st.st_mode):
             return f"ERROR: Path is not a file: {path_obj}"
         
         # Check file size (prevent reading huge files)
-        file_size = path_obj.stat().st_size
+        file_size = st.st_size
         if file_size > 10 * 1024 * 1024:  # 10MB limit
             return f"ERROR: File too large ({file_size} bytes): {path_obj}"
         
         ext = path_obj.suffix.lower()
         
         # Handle images
-        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg']:
+        if ext in _IMAGE_EXTS:
             try:
-                with open(path_obj, 'rb') as f:
-                    encoded = base64.b64encode(f.read()).decode('utf-8')
-                    return f"data:image/{ext[1:]};base64,{encoded}"
+                return _encode_image(path_obj, ext, file_size)
             except Exception as e:
                 return f"ERROR: Failed to encode image {path_obj}: {str(e)}"
         
         # Handle text files
-        encodings = ['utf-8', 'utf-16', 'latin1']
-        for encoding in encodings:
-            try:
-                with open(path_obj, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    # Validate content isn't binary
-                    if '\x00' in content:
-                        return f"ERROR: File appears to be binary: {path_obj}"
-                    return content
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                return f"ERROR: Failed to read file {path_obj}: {str(e)}"
-        
-        return f"ERROR: Unable to decode file with any supported encoding: {path_obj}"
+        return _read_text(path_obj, file_size)
         
     except Exception as e:
         return f"ERROR: Unexpected error reading {path}: {str(e)}"
 
 
-@tool("write_file") 
-def write_file(path: str, content: str) -> str:
-    """
-    Enhanced file writing with validation and error handling.
-    Supports text files and base64 image data.
-    """
+def _write_file_impl(path: str, content: str, validate_json: bool = False) -> str:
+    """Shared implementation of write_file and direct_write_file."""
     # Allow short files for specific types
-    allowed_short_extensions = ['.json', '.log', '.env', '.gitignore', '.md', '.txt']
-    is_allowed_short = any(path.endswith(ext) for ext in allowed_short_extensions)
+    # Dotfiles such as .env have no suffix, so their name is checked as well
+    name = os.path.basename(path) if isinstance(path, str) else ""
+    is_allowed_short = os.path.splitext(name)[1].lower() in _SHORT_OK or name in _SHORT_OK
     
     if content and len(str(content)) < 50 and not is_allowed_short:
         return "ERROR: Content too short or truncated; provide complete code."
@@ -83,19 +206,21 @@ def write_file(path: str, content: str) -> str:
         if not cleaned_path:
             return "ERROR: Empty path after cleaning"
         
-        path_obj = Path(cleaned_path.replace("\\", "/"))
+        path_obj = Path(_normalize_sep(cleaned_path))
         
         # Create directory structure
-        path_obj.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_parent(path_obj)
+        invalidate_collected_file(str(path_obj))
         
         # Check for base64 image data
         if content.startswith('data:image/'):
             try:
-                # Parse data URL
-                header, data = content.split(',', 1)
-                with open(path_obj, 'wb') as f:
-                    f.write(base64.b64decode(data))
-                return f"SUCCESS: Image written to {path_obj} ({len(data)} chars base64)"
+                # Parse data URL; the payload is decoded in place rather than split off as a copy
+                comma = content.find(',')
+                if comma < 0:
+                    return f"ERROR: Failed to write image {path_obj}: data URL has no base64 payload"
+                _decode_image(path_obj, content, comma + 1)
+                return f"SUCCESS: Image written to {path_obj} ({len(content) - comma - 1} chars base64)"
             except Exception as e:
                 return f"ERROR: Failed to write image {path_obj}: {str(e)}"
         
@@ -107,13 +232,21 @@ def write_file(path: str, content: str) -> str:
         
         # Write as text file
         try:
-            with open(path_obj, mode, encoding='utf-8', newline='') as f:
-                if mode == 'a':
-                    f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {content}\n")
-                else:
-                    f.write(content)
+            # Special validation for JSON files
+            if validate_json and path_obj.suffix.lower() == '.json' and mode != 'a':
+                try:
+                    _json_loads(content)  # Validate JSON before writing
+                except json.JSONDecodeError as e:  # orjson's error subclasses this
+                    return f"ERROR: Invalid JSON content for {path_obj}: {str(e)}"
+            
+            if mode == 'a':
+                content = f"{log_timestamp()} - {content}\n"
+            # Binary mode writes the same bytes as text mode with newline='', and tell() then
+            # gives the resulting file size without another stat
+            with _open_for_write(path_obj, mode + 'b') as f:
+                f.write(content.encode('utf-8'))
+                file_size = f.tell()
             
-            file_size = path_obj.stat().st_size
             return f"SUCCESS: Text file written to {path_obj} ({file_size} bytes)"
             
         except Exception as e:
@@ -123,13 +256,10 @@ def write_file(path: str, content: str) -> str:
         return f"ERROR: Unexpected error writing file: {str(e)}"
 
 
-@tool("list_files")
-def list_files(directory: str = ".") -> str:
-    """
-    Enhanced directory listing with error handling and file info.
-    """
+def _list_files_impl(directory: str = ".") -> str:
+    """Shared implementation of list_files and direct_list_files."""
     try:
-        dir_path = Path(directory.replace("\\", "/"))
+        dir_path = Path(_normalize_sep(directory))
         
         if not dir_path.exists():
             return f"ERROR: Directory not found: {dir_path}"
@@ -138,11 +268,13 @@ def list_files(directory: str = ".") -> str:
             return f"ERROR: Path is not a directory: {dir_path}"
         
         try:
+            # DirEntry caches the file type from readdir, so only sizes cost a stat
+            with os.scandir(dir_path) as it:
+                items = sorted(it, key=lambda e: e.name)
             entries = []
-            for item in sorted(dir_path.iterdir()):
+            for item in items:
                 if item.is_file():
-                    size = item.stat().st_size
-                    entries.append(f"{item.name} ({size} bytes)")
+                    entries.append(f"{item.name} ({item.stat().st_size} bytes)")
                 elif item.is_dir():
                     entries.append(f"{item.name}/ (directory)")
             
@@ -165,156 +297,53 @@ def direct_read_file(path: str) -> str:
     Direct file reading without tool decorator.
     Supports text files (UTF-8) and images (base64).
     """
-    try:
-        path_obj = Path(path.replace("\\", "/"))
-        
-        if not path_obj.exists():
-            return f"ERROR: File not found at path: {path_obj}"
-        
-        if not path_obj.is_file():
-            return f"ERROR: Path is not a file: {path_obj}"
-        
-        # Check file size (prevent reading huge files)
-        file_size = path_obj.stat().st_size
-        if file_size > 10 * 1024 * 1024:  # 10MB limit
-            return f"ERROR: File too large ({file_size} bytes): {path_obj}"
-        
-        ext = path_obj.suffix.lower()
-        
-        # Handle images
-        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg']:
-            try:
-                with open(path_obj, 'rb') as f:
-                    encoded = base64.b64encode(f.read()).decode('utf-8')
-                    return f"data:image/{ext[1:]};base64,{encoded}"
-            except Exception as e:
-                return f"ERROR: Failed to encode image {path_obj}: {str(e)}"
-        
-        # Handle text files
-        encodings = ['utf-8', 'utf-16', 'latin1']
-        for encoding in encodings:
-            try:
-                with open(path_obj, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    # Validate content isn't binary
-                    if '\x00' in content:
-                        return f"ERROR: File appears to be binary: {path_obj}"
-                    return content
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                return f"ERROR: Failed to read file {path_obj}: {str(e)}"
-        
-        return f"ERROR: Unable to decode file with any supported encoding: {path_obj}"
-        
-    except Exception as e:
-        return f"ERROR: Unexpected error reading {path}: {str(e)}"
+    return _read_file_impl(path)
 
 def direct_write_file(path: str, content: str) -> str:
     """
     Direct file writing without tool decorator.
-    Supports text files and base64 image data.
+    Supports text files and base64 image data; JSON content is validated before writing.
     """
-    # Allow short files for specific types
-    allowed_short_extensions = ['.json', '.log', '.env', '.gitignore', '.md', '.txt']
-    is_allowed_short = any(path.endswith(ext) for ext in allowed_short_extensions)
-    
-    if content and len(str(content)) < 50 and not is_allowed_short:
-        return "ERROR: Content too short or truncated; provide complete code."
-    
-    try:
-        # Input validation
-        if not path or not isinstance(path, str):
-            return "ERROR: Invalid path provided"
-        
-        if content is None:
-            content = ""
-        elif not isinstance(content, str):
-            return f"ERROR: Content must be string, got {type(content)}"
-        
-        # Clean and validate path
-        cleaned_path = path.strip().strip('"\'')
-        if not cleaned_path:
-            return "ERROR: Empty path after cleaning"
-        
-        path_obj = Path(cleaned_path.replace("\\", "/"))
-        
-        # Create directory structure
-        path_obj.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Check for base64 image data
-        if content.startswith('data:image/'):
-            try:
-                # Parse data URL
-                header, data = content.split(',', 1)
-                with open(path_obj, 'wb') as f:
-                    f.write(base64.b64decode(data))
-                return f"SUCCESS: Image written to {path_obj} ({len(data)} chars base64)"
-            except Exception as e:
-                return f"ERROR: Failed to write image {path_obj}: {str(e)}"
-        
-        # Handle log file appending
-        if path_obj.name == 'generation.log':
-            mode = 'a'  # Append mode for log files
-        else:
-            mode = 'w'  # Write mode for other files
-        
-        # Write as text file
-        try:
-            # Special validation for JSON files
-            if path_obj.suffix.lower() == '.json' and mode != 'a':
-                try:
-                    import json
-                    json.loads(content)  # Validate JSON before writing
-                except json.JSONDecodeError as e:
-                    return f"ERROR: Invalid JSON content for {path_obj}: {str(e)}"
-            
-            with open(path_obj, mode, encoding='utf-8', newline='') as f:
-                if mode == 'a':
-                    f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {content}\n")
-                else:
-                    f.write(content)
-                    
-            file_size = path_obj.stat().st_size
-            return f"SUCCESS: Text file written to {path_obj} ({file_size} bytes)"
-            
-        except Exception as e:
-            return f"ERROR: Failed to write text file {path_obj}: {str(e)}"
-        
-    except Exception as e:
-        return f"ERROR: Unexpected error writing file: {str(e)}"
+    return _write_file_impl(path, content, validate_json=True)
 
 def direct_list_files(directory: str = ".") -> str:
     """
     Direct directory listing without tool decorator.
     """
-    try:
-        dir_path = Path(directory.replace("\\", "/"))
-        
-        if not dir_path.exists():
-            return f"ERROR: Directory not found: {dir_path}"
-        
-        if not dir_path.is_dir():
-            return f"ERROR: Path is not a directory: {dir_path}"
-        
-        try:
-            entries = []
-            for item in sorted(dir_path.iterdir()):
-                if item.is_file():
-                    size = item.stat().st_size
-                    entries.append(f"{item.name} ({size} bytes)")
-                elif item.is_dir():
-                    entries.append(f"{item.name}/ (directory)")
-            
-            if not entries:
-                return f"Directory is empty: {dir_path}"
-            
-            return "\n".join(entries)
-            
-        except PermissionError:
-            return f"ERROR: Permission denied accessing directory: {dir_path}"
-        except Exception as e:
-            return f"ERROR: Failed to list directory {dir_path}: {str(e)}"
-        
-    except Exception as e:
-        return f"ERROR: Unexpected error listing directory: {str(e)}"
\ No newline at end of file
+    return _list_files_impl(directory)
+
+
+def _read_file(path: str) -> str:
+    """
+    Enhanced file reading with comprehensive error handling.
+    Supports text files (UTF-8) and images (base64).
+    """
+    return _read_file_impl(path)
+
+
+def _write_file(path: str, content: str) -> str:
+    """
+    Enhanced file writing with validation and error handling.
+    Supports text files and base64 image data.
+    """
+    return _write_file_impl(path, content)
+
+
+def _list_files(directory: str = ".") -> str:
+    """
+    Enhanced directory listing with error handling and file info.
+    """
+    return _list_files_impl(directory)
+
+
+# CrewAI tool wrappers are built on first access (PEP 562), so importing the direct_*
+# helpers does not pull in crewai
+_TOOL_FUNCS = {"read_file": _read_file, "write_file": _write_file, "list_files": _list_files}
+
+def __getattr__(name: str):
+    if name in _TOOL_FUNCS:
+        from crewai.tools import tool
+        wrapped = tool(name)(_TOOL_FUNCS[name])
+        globals()[name] = wrapped
+        return wrapped
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,199 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SemanticLLMCache:
+    """
+    SQLite-backed cache of LLM responses.
+
+    Lookups first try an exact key (sha256 of model, temperature and prompt), served from
+    an in-memory LRU of at most max_entries in front of SQLite, then from SQLite itself. Callers may opt into a semantic fallback by passing the user-supplied text that
+    varies between requests (not the rendered prompt, whose fixed template would dominate the
+    embedding) together with a scope naming the template it was rendered into; its
+    sentence-transformers embedding is compared only against entries of the same model and scope. Entries expire after
+    ttl_seconds and the least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 500,
+                 similarity_threshold: float = 0.92, embedding_model: str = "all-MiniLM-L6-v2"):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self._encoder = None  # None = not loaded yet, False = unavailable
+        self._lock = threading.Lock()
+        self._exact: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # Keys hit since the last write; their last_used is flushed in one batch by set() and close()
+        self._touched: Set[str] = set()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                embedding BLOB,
+                scope TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "scope" not in columns:
+            # Older databases embedded whole prompts; leaving their scope NULL keeps them out of semantic lookups
+            self._conn.execute("ALTER TABLE responses ADD COLUMN scope TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_model ON responses(model)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str) -> str:
+        """Build the exact-match cache key for a prompt."""
+        digest = hashlib.sha256()
+        for part in (model, repr(float(temperature)), prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_scope(template: str) -> str:
+        """Identify a prompt template, so semantic matches never cross templates or template edits."""
+        return hashlib.sha256(template.encode('utf-8')).hexdigest()
+
+    def get(self, model: str, temperature: float, prompt: str,
+            semantic_text: Optional[str] = None, semantic_scope: str = "") -> Optional[str]:
+        """
+        Return a cached response for the prompt, or None on a miss. When semantic_text is
+        given, a miss falls back to the closest entry stored with the same scope.
+        """
+        key = self.make_key(model, temperature, prompt)
+        now = time.time()
+        with self._lock:
+            hit = self._exact.get(key)
+            if hit is not None:
+                if now - hit[1] <= self.ttl_seconds:
+                    self._exact.move_to_end(key)
+                    self._touched.add(key)
+                    return hit[0]
+                del self._exact[key]
+
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._touched.add(key)
+                self._remember(key, row[0], row[1])
+                return row[0]
+
+        if semantic_text is None:
+            return None
+        return self._semantic_get(model, semantic_text, self.make_scope(semantic_scope), now)
+
+    def set(self, model: str, temperature: float, prompt: str, response: str,
+            semantic_text: Optional[str] = None, semantic_scope: str = ""):
+        """
+        Store a response, pruning expired and least recently used entries. semantic_text,
+        when given, is embedded for later semantic lookups within semantic_scope.
+        """
+        key = self.make_key(model, temperature, prompt)
+        embedding = self._embed(semantic_text) if semantic_text is not None else None
+        blob = embedding.tobytes() if embedding is not None else None
+        scope = self.make_scope(semantic_scope) if blob is not None else None
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            self._flush_touched(now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, embedding, scope, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, response, blob, scope, now, now)
+            )
+            # Expired rows, then everything beyond the max_entries most recently used
+            stale = [row[0] for row in self._conn.execute(
+                "SELECT key FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses WHERE created_at >= ? ORDER BY last_used DESC LIMIT ?)",
+                (now - self.ttl_seconds, self.max_entries)
+            )]
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", ((k,) for k in stale))
+            self._conn.commit()
+            for stale_key in stale:
+                self._exact.pop(stale_key, None)
+
+    def _remember(self, key: str, response: str, created_at: float):
+        """Put an entry at the recent end of the in-memory LRU, evicting beyond max_entries. Caller holds _lock."""
+        self._exact[key] = (response, created_at)
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.max_entries:
+            self._exact.popitem(last=False)
+
+    def _flush_touched(self, now: float):
+        """Write last_used for every key hit since the last flush, without committing. Caller holds _lock."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?", ((now, k) for k in self._touched)
+            )
+            self._touched.clear()
+
+    def _semantic_get(self, model: str, text: str, scope: str, now: float) -> Optional[str]:
+        """Return the closest stored response of the same scope above the similarity threshold."""
+        embedding = self._embed(text)
+        if embedding is None:
+            return None
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, response, embedding FROM responses "
+                "WHERE model = ? AND scope = ? AND embedding IS NOT NULL AND created_at >= ?",
+                (model, scope, now - self.ttl_seconds)
+            ).fetchall()
+
+        best_key, best_response, best_score = None, None, self.similarity_threshold
+        for key, response, blob in rows:
+            stored = array('f')
+            stored.frombytes(blob)
+            if len(stored) != len(embedding):
+                continue
+            # Embeddings are normalized on encode, so the dot product is the cosine similarity
+            score = sum(a * b for a, b in zip(embedding, stored))
+            if score >= best_score:
+                best_key, best_response, best_score = key, response, score
+
+        if best_key is None:
+            return None
+
+        logger.info(f"Semantic cache hit (similarity {best_score:.3f})")
+        with self._lock:
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, best_key))
+            self._conn.commit()
+        return best_response
+
+    def _embed(self, text: str) -> Optional[array]:
+        """Embed text with sentence-transformers; None when the package is unavailable."""
+        if self._encoder is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._encoder = SentenceTransformer(self.embedding_model)
+            except Exception as e:
+                logger.warning(f"Semantic cache disabled, embeddings unavailable: {e}")
+                self._encoder = False
+        if self._encoder is False:
+            return None
+
+        vector = self._encoder.encode(text, normalize_embeddings=True)
+        return array('f', (float(x) for x in vector))
+
+    def close(self):
+        """Flush pending last_used updates and close the underlying database connection."""
+        with self._lock:
+            self._flush_touched(time.time())
+            self._conn.commit()
+            self._conn.close()
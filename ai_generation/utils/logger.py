@@ -1,7 +1,21 @@
 import logging
 import sys
+import time
 from pathlib import Path
 
+# (epoch second, formatted) of the last timestamp handed out
+_last_timestamp = (0, "")
+
+def log_timestamp() -> str:
+    """Return the current time as 'YYYY-mm-dd HH:MM:SS', formatting at most once per second."""
+    global _last_timestamp
+    now = int(time.time())
+    cached = _last_timestamp
+    if cached[0] != now:
+        cached = (now, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)))
+        _last_timestamp = cached
+    return cached[1]
+
 def setup_logger(name: str, level: int = logging.DEBUG) -> logging.Logger:
     """Setup enhanced logger with file and console output."""
     logger = logging.getLogger(name)
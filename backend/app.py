@@ -1,17 +1,37 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
 from backend.routers import generate
+from backend.services.preview_service import reap_previews, stop_all_previews
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Configure logging once for the whole application; service modules only create loggers
+logging.basicConfig(level=logging.INFO)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sweep previews that exited on their own while the app runs; stop the rest on shutdown
+    reaper = asyncio.create_task(reap_previews())
+    try:
+        yield
+    finally:
+        reaper.cancel()
+        await asyncio.gather(reaper, return_exceptions=True)
+        await run_in_threadpool(stop_all_previews)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="WebGenAI MVP",
     description="AI-powered platform for generating MERN stack websites",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS to allow requests from React frontend
@@ -1,16 +1,23 @@
 # backend/routers/generate.py
 from fastapi import APIRouter, Depends, HTTPException, Response
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from backend.models.project import ProjectCreate, Project
-from backend.services.db import create_project, get_project
+from backend.services.db import create_project, get_project, project_exists
 from backend.services.preview_service import start_preview, stop_preview
-from backend.services.zip_service import create_zip
+from backend.services.zip_service import stream_zip
 from backend.utils.helpers import generate_mern_code
-import io
 import uuid
 
-router = APIRouter()
+# ORJSONResponse needs orjson at render time, so it is only the default when installed
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+except ImportError:
+    _DefaultResponse = JSONResponse
+
+router = APIRouter(default_response_class=_DefaultResponse)
 
 class GenerateRequest(BaseModel):
     description: str
@@ -18,35 +25,32 @@ class GenerateRequest(BaseModel):
 @router.post("/generate", response_model=Project)
 async def generate_site(request: GenerateRequest):
     project_id = str(uuid.uuid4())
-    file_paths = generate_mern_code(request.description, project_id)
+    # pymongo and the generator block, so they run in the threadpool to keep the event loop free
+    file_paths = await run_in_threadpool(generate_mern_code, request.description, project_id)
     if not file_paths:
         raise HTTPException(status_code=500, detail="Failed to generate MERN code")
-    create_project(request.description, file_paths, project_id)
-    project = get_project(project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found after creation")
-    return project
+    # The stored document is returned directly instead of being read back from MongoDB
+    return await run_in_threadpool(create_project, request.description, file_paths, project_id)
 
 @router.get("/preview/{project_id}")
 async def preview_site(project_id: str):
-    project = get_project(project_id)
+    project = await run_in_threadpool(get_project, project_id, ("file_paths",))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    preview_url = start_preview(project_id, project["file_paths"])
+    # npm install and the readiness wait take seconds; run them off the event loop
+    preview_url = await run_in_threadpool(start_preview, project_id, project["file_paths"])
     return {"preview_url": preview_url}
 
 @router.get("/download/{project_id}")
 async def download_site(project_id: str):
-    project = get_project(project_id)
+    project = await run_in_threadpool(get_project, project_id, ("file_paths",))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    zip_buffer = io.BytesIO()
-    create_zip(project_id, project["file_paths"], zip_buffer)
-    zip_buffer.seek(0)
+    # Chunks are sent as each file is compressed instead of after building the whole archive
     return StreamingResponse(
-        zip_buffer,
+        stream_zip(project_id, project["file_paths"]),
         media_type="application/zip",
-        headers={"Content-Disposition": f"attachment; filename={project_id}.zip"}
+        headers={"Content-Disposition": f'attachment; filename="{project_id}.zip"'}
     )
 
 @router.post("/stop-preview/{project_id}")
@@ -54,8 +58,7 @@ async def stop_preview_endpoint(project_id: str):
     """
     Stop the preview server for a given project.
     """
-    project = get_project(project_id)
-    if not project:
+    if not await run_in_threadpool(project_exists, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    stop_preview(project_id)
+    await run_in_threadpool(stop_preview, project_id)
     return {"message": f"Preview stopped for project {project_id}"}
\ No newline at end of file
@@ -1,19 +1,28 @@
 # backend/services/db.py
-from pymongo import MongoClient
+from pymongo import MongoClient, WriteConcern
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 from dotenv import load_dotenv
 import os
 
 # Load environment variables
 load_dotenv()
 
-# MongoDB client setup
-client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/webgenai"))
+# MongoDB client setup: a warm pool that is reused across requests, a short server selection
+# timeout so an unreachable database fails fast, and zlib (bundled with Python) wire compression
+client = MongoClient(
+    os.getenv("MONGO_URI", "mongodb://localhost:27017/webgenai"),
+    maxPoolSize=50,
+    minPoolSize=5,
+    maxIdleTimeMS=60000,
+    serverSelectionTimeoutMS=2000,
+    compressors="zlib",
+)
 db = client["webgenai"]
-projects_collection = db["projects"]
+# Inserts are acknowledged by the primary without waiting for the journal to be flushed
+projects_collection = db.get_collection("projects", write_concern=WriteConcern(w=1, j=False))
 
-def create_project(description: str, file_paths: Dict[str, str], project_id: str) -> str:
+def create_project(description: str, file_paths: Dict[str, str], project_id: str) -> Dict:
     """
     Store a new project in MongoDB with a custom project_id as _id and return it.
     
@@ -23,7 +32,8 @@ def create_project(description: str, file_paths: Dict[str, str], project_id: str
         project_id (str): Custom ID for the project (UUID string).
     
     Returns:
-        str: The ID of the created project.
+        Dict: The stored project, shaped like get_project's result, so callers
+        do not need to read it back.
     """
     project_data = {
         "_id": project_id,  # Set custom string _id
@@ -32,20 +42,24 @@ def create_project(description: str, file_paths: Dict[str, str], project_id: str
         "created_at": datetime.utcnow()
     }
     projects_collection.insert_one(project_data)
-    return project_id
+    project = dict(project_data)
+    project["id"] = project.pop("_id")
+    return project
 
-def get_project(project_id: str) -> Optional[Dict]:
+def get_project(project_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
     """
     Retrieve a project by its ID from MongoDB.
     
     Args:
         project_id (str): The ID of the project to retrieve.
+        fields (Optional[Iterable[str]]): Fields to fetch; all fields when None.
     
     Returns:
         Optional[Dict]: The project data if found, else None.
     """
+    projection = dict.fromkeys(fields, 1) if fields is not None else None
     try:
-        project = projects_collection.find_one({"_id": project_id})
+        project = projects_collection.find_one({"_id": project_id}, projection)
         if project:
             # Set 'id' for consistency with Pydantic model
             project["id"] = project["_id"]
@@ -53,4 +67,19 @@ def get_project(project_id: str) -> Optional[Dict]:
             return project
         return None
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+def project_exists(project_id: str) -> bool:
+    """
+    Check whether a project exists without fetching the document.
+    
+    Args:
+        project_id (str): The ID of the project to look up.
+    
+    Returns:
+        bool: True if the project exists.
+    """
+    try:
+        return projects_collection.count_documents({"_id": project_id}, limit=1) > 0
+    except Exception:
+        return False
@@ -1,65 +1,111 @@
 # backend/services/preview_service.py
+import asyncio
 import subprocess
 import os
 import time
 import socket
-from typing import Dict, Optional
+import select
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException
 import logging
+import threading
+import weakref
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-active_processes = {}
+class _Registry:
+    """Thread-safe map of project_id -> (preview server process, port it listens on)."""
 
-def is_port_in_use(port: int) -> bool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._procs: Dict[str, Tuple[subprocess.Popen, int]] = {}
+
+    def add(self, project_id: str, process: subprocess.Popen, port: int) -> None:
+        with self._lock:
+            self._procs[project_id] = (process, port)
+
+    def get(self, project_id: str) -> Optional[Tuple[subprocess.Popen, int]]:
+        with self._lock:
+            return self._procs.get(project_id)
+
+    def pop(self, project_id: str) -> Optional[Tuple[subprocess.Popen, int]]:
+        with self._lock:
+            return self._procs.pop(project_id, None)
+
+    def project_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._procs)
+
+    def reap(self) -> List[str]:
+        """Drop entries whose process has exited on its own; poll() also reaps the child."""
+        with self._lock:
+            exited = [pid for pid, (process, _) in self._procs.items() if process.poll() is not None]
+            for project_id in exited:
+                del self._procs[project_id]
+        return exited
+
+active_processes = _Registry()
+# One lock per project: a slow npm install only holds up requests for the same project.
+# Reentrant because start_preview stops any lingering preview while holding it. Held weakly,
+# so a project's entry disappears once no request is using its lock
+_project_locks: "weakref.WeakValueDictionary[str, threading.RLock]" = weakref.WeakValueDictionary()
+_project_locks_guard = threading.Lock()
+
+def _project_lock(project_id: str) -> threading.RLock:
+    """Return the lock serializing start/stop of one project's preview."""
+    with _project_locks_guard:
+        lock = _project_locks.get(project_id)
+        if lock is None:
+            lock = _project_locks[project_id] = threading.RLock()
+        return lock
+
+def _reserve_port() -> int:
     """
-    Check if a port is already in use.
-    
-    Args:
-        port (int): Port number to check.
+    Pick a free port for a preview server by letting the OS assign one.
     
     Returns:
-        bool: True if the port is in use, False otherwise.
+        int: An ephemeral port that was free at the time of the call.
     """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        try:
-            s.bind(("localhost", port))
-            return False
-        except socket.error:
-            return True
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
 
-def start_preview(project_id: str, file_paths: Dict[str, str]) -> str:
-    """
-    Start a temporary Node.js server for previewing the generated MERN project.
-    If already running, return the existing URL.
+def _needs_install(project_dir: str) -> bool:
     """
-    logger.info(f"Starting preview for project {project_id}")
+    Check whether npm install has to run for a project.
     
-    # Check if a process is already running for this project
-    if project_id in active_processes and active_processes[project_id].poll() is None:
-        logger.info(f"Preview already running for project {project_id}")
-        return "http://localhost:4001"  # Return existing URL if active
+    npm records the installed tree in node_modules/.package-lock.json; if that is
+    newer than package.json, the dependencies are already in place (e.g. on a
+    repeated preview of the same project).
     
-    project_dir = os.path.dirname(file_paths.get("backend", ""))
-    logger.info(f"Project directory: {project_dir}")
-    if not project_dir or not os.path.exists(project_dir):
-        logger.error(f"Invalid project directory: {project_dir}")
-        raise HTTPException(status_code=400, detail=f"Invalid project directory: {project_dir}")
-
-    # Stop any lingering preview (though check above should prevent)
-    stop_preview(project_id)
-
-    # Check if port 4001 is in use
-    if is_port_in_use(4001):
-        logger.error("Port 4001 is already in use")
-        raise HTTPException(status_code=500, detail="Port 4001 is already in use by another process")
+    Args:
+        project_dir (str): The project directory containing package.json.
+    
+    Returns:
+        bool: True if dependencies are missing or package.json changed since the last install.
+    """
+    try:
+        installed = os.stat(os.path.join(project_dir, "node_modules", ".package-lock.json")).st_mtime_ns
+        declared = os.stat(os.path.join(project_dir, "package.json")).st_mtime_ns
+    except OSError:
+        return True
+    return declared > installed
 
+def _npm_install(project_dir: str) -> None:
+    """
+    Install a project's dependencies, preferring packages already in the npm cache.
+    
+    Args:
+        project_dir (str): The project directory containing package.json.
+    
+    Raises:
+        HTTPException: If npm is missing or the install fails.
+    """
     logger.info("Running npm install")
     try:
+        # Cached packages skip the registry round-trips; audit and funding lookups are network-only extras
         result = subprocess.run(
-            ["npm.cmd", "install"],
+            ["npm.cmd", "install", "--prefer-offline", "--no-audit", "--no-fund"],
             cwd=project_dir,
             check=True,
             capture_output=True,
@@ -73,41 +119,201 @@ def start_preview(project_id: str, file_paths: Dict[str, str]) -> str:
         logger.error("npm not found")
         raise HTTPException(status_code=500, detail="npm not found. Ensure Node.js is installed and added to PATH.")
 
-    logger.info("Starting Node server")
+def _read_log_tail(log_path: str, limit: int = 65536) -> str:
+    """
+    Read the end of a preview log without waiting on the process that writes it.
+    
+    Args:
+        log_path (str): Path of the log file.
+        limit (int): Maximum number of trailing bytes to read.
+    
+    Returns:
+        str: The decoded tail of the log, or a placeholder if it cannot be read.
+    """
     try:
-        process = subprocess.Popen(
-            ["npm.cmd", "start"],
-            cwd=project_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        time.sleep(2)
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - limit, 0))
+            return f.read().decode("utf-8", errors="replace") or "Unknown error"
+    except OSError:
+        return "Unknown error"
+
+def _wait_until_ready(process: subprocess.Popen, port: int, log_path: str, timeout: float = 15.0) -> bool:
+    """
+    Wait for the preview server to accept connections on the given port.
+    
+    Args:
+        process (subprocess.Popen): The preview server process.
+        port (int): Port the server is expected to listen on.
+        log_path (str): File receiving the server's output, reported on failure.
+        timeout (float): Seconds to wait before giving up.
+    
+    Returns:
+        bool: True once the port answers, False if the process is still running
+        but did not start listening within the timeout.
+    
+    Raises:
+        HTTPException: If the process exits before the port answers.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
         if process.poll() is not None:
-            error_output = process.stderr.read() if process.stderr else "Unknown error"
+            error_output = _read_log_tail(log_path)
             logger.error(f"Preview server failed: {error_output}")
             raise HTTPException(status_code=500, detail=f"Preview server failed: {error_output}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return True
+        except OSError:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+
+def start_preview(project_id: str, file_paths: Dict[str, str]) -> str:
+    """
+    Start a temporary Node.js server for previewing the generated MERN project.
+    If already running, return the existing URL.
+    """
+    # Makes the check-and-insert for this project atomic now that requests run in the threadpool;
+    # other projects' previews start and stop independently
+    with _project_lock(project_id):
+        logger.info(f"Starting preview for project {project_id}")
+    
+        # Check if a process is already running for this project
+        running = active_processes.get(project_id)
+        if running and running[0].poll() is None:
+            logger.info(f"Preview already running for project {project_id}")
+            return f"http://localhost:{running[1]}"  # Return existing URL if active
+    
+        project_dir = os.path.dirname(file_paths.get("backend", ""))
+        logger.info(f"Project directory: {project_dir}")
+        if not project_dir or not os.path.exists(project_dir):
+            logger.error(f"Invalid project directory: {project_dir}")
+            raise HTTPException(status_code=400, detail=f"Invalid project directory: {project_dir}")
 
-        active_processes[project_id] = process
-        preview_url = "http://localhost:4001"
-        logger.info(f"Preview started at {preview_url}")
-        return preview_url
-    except Exception as e:
-        logger.error(f"Failed to start preview: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to start preview: {str(e)}")
+        # Stop any lingering preview (though check above should prevent)
+        stop_preview(project_id)
+
+        if not _needs_install(project_dir):
+            logger.info("node_modules is up to date, skipping npm install")
+        else:
+            _npm_install(project_dir)
+
+        # Each preview gets its own port, passed to the server through PORT
+        port = _reserve_port()
+        logger.info(f"Starting Node server on port {port}")
+        # Output goes to a log file rather than pipes: nobody drains the pipes while the server
+        # runs, so a chatty server would block once they filled, and reading them on failure
+        # could block until every process holding the write end exited
+        log_path = os.path.join(project_dir, "preview.log")
+        try:
+            with open(log_path, "wb") as log_file:
+                process = subprocess.Popen(
+                    ["npm.cmd", "start"],
+                    cwd=project_dir,
+                    env={**os.environ, "PORT": str(port)},
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT
+                )
+            # Return as soon as the server answers instead of sleeping a fixed interval
+            if not _wait_until_ready(process, port, log_path):
+                logger.warning(f"Preview server is running but not yet listening on port {port}")
+
+            active_processes.add(project_id, process, port)
+            preview_url = f"http://localhost:{port}"
+            logger.info(f"Preview started at {preview_url}")
+            return preview_url
+        except Exception as e:
+            logger.error(f"Failed to start preview: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to start preview: {str(e)}")
+
+def _event_wait(process: subprocess.Popen, timeout: float) -> int:
+    """
+    Wait for a process to exit, woken by the kernel instead of polling.
+    
+    Uses a pidfd on Linux and a kqueue exit filter on macOS/BSD; elsewhere, or if
+    either is unavailable, falls back to Popen.wait.
+    
+    Args:
+        process (subprocess.Popen): The process to wait for.
+        timeout (float): Seconds to wait.
+    
+    Returns:
+        int: The process return code.
+    
+    Raises:
+        subprocess.TimeoutExpired: If the process is still running after timeout.
+    """
+    if process.poll() is not None:
+        return process.returncode
+    try:
+        if hasattr(os, "pidfd_open"):
+            fd = os.pidfd_open(process.pid)
+            try:
+                poller = select.poll()
+                poller.register(fd, select.POLLIN)
+                ready = poller.poll(timeout * 1000)
+            finally:
+                os.close(fd)
+        elif hasattr(select, "kqueue"):
+            kq = select.kqueue()
+            try:
+                event = select.kevent(
+                    process.pid,
+                    filter=select.KQ_FILTER_PROC,
+                    flags=select.KQ_EV_ADD | select.KQ_EV_ENABLE | select.KQ_EV_ONESHOT,
+                    fflags=select.KQ_NOTE_EXIT
+                )
+                ready = kq.control([event], 1, timeout)
+            finally:
+                kq.close()
+        else:
+            return process.wait(timeout=timeout)
+    except OSError:
+        # The process may already have been reaped, or the kernel lacks support
+        return process.wait(timeout=timeout)
+
+    if not ready:
+        raise subprocess.TimeoutExpired(process.args, timeout)
+    # The process has exited, so this only reaps it
+    return process.wait()
 
 def stop_preview(project_id: str) -> None:
     """
     Stop the preview server for a given project.
     """
-    process = active_processes.get(project_id)
-    if process:
-        try:
-            process.terminate()
-            process.wait(timeout=5)
-            logger.info(f"Preview stopped for project {project_id}")
-        except subprocess.TimeoutExpired:
-            process.kill()
-            logger.warning(f"Force killed preview for project {project_id}")
-        finally:
-            active_processes.pop(project_id, None)
\ No newline at end of file
+    with _project_lock(project_id):
+        entry = active_processes.get(project_id)
+        if entry:
+            process = entry[0]
+            try:
+                process.terminate()
+                _event_wait(process, 5)
+                logger.info(f"Preview stopped for project {project_id}")
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()  # Reap the killed process so it does not linger as a zombie
+                logger.warning(f"Force killed preview for project {project_id}")
+            finally:
+                active_processes.pop(project_id)
+
+def stop_all_previews() -> None:
+    """
+    Stop every running preview server, e.g. on application shutdown.
+    """
+    for project_id in active_processes.project_ids():
+        stop_preview(project_id)
+
+async def reap_previews(interval: float = 5.0) -> None:
+    """
+    Periodically drop previews whose server exited on its own, so their process
+    handles do not accumulate. Runs until cancelled.
+    
+    Args:
+        interval (float): Seconds between sweeps.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        for project_id in active_processes.reap():
+            logger.info(f"Preview for project {project_id} exited, removed from registry")
@@ -1,32 +1,95 @@
 import zipfile
 import os
 import io
-from typing import Dict
+from typing import Dict, Iterator, List, Tuple
 from fastapi import HTTPException
 
-def create_zip(project_id: str, file_paths: Dict[str, str], buffer: io.BytesIO) -> None:
+# Already-compressed formats are stored as-is; deflating them again costs CPU for no gain
+_STORED_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.ico', '.woff', '.woff2', '.zip', '.gz', '.br'})
+
+# Runtime artifacts written next to the project that are not part of it
+_EXCLUDED_FILES = frozenset({'preview.log'})
+
+class _ChunkWriter(io.RawIOBase):
+    """Unseekable sink that collects what ZipFile writes so it can be handed out as chunks."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> Iterator[bytes]:
+        """
+        Hand out everything written since the last drain as one chunk. ZipFile issues
+        several small writes per entry, so joining them keeps the response from sending
+        a packet per header field.
+        """
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            yield data
+
+def _project_dir(project_id: str) -> str:
+    project_dir = os.path.join("temp_projects", project_id)
+    if not os.path.exists(project_dir):
+        raise HTTPException(status_code=400, detail=f"Project directory not found: {project_dir}")
+    return project_dir
+
+def _iter_project_files(project_dir: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield (path, arcname, lowercased extension) for every file under project_dir.
+    scandir entries carry their type, and arcnames (e.g. 'client/App.js') are built
+    by prefixing rather than with relpath.
+    """
+    stack = [(project_dir, "")]
+    while stack:
+        directory, prefix = stack.pop()
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, prefix + entry.name + "/"))
+                elif entry.is_file() and not (prefix == "" and entry.name in _EXCLUDED_FILES):
+                    yield entry.path, prefix + entry.name, os.path.splitext(entry.name)[1].lower()
+
+def _write_project(zip_file: zipfile.ZipFile, project_dir: str) -> Iterator[None]:
+    """Add every file under project_dir to zip_file, yielding after each one."""
+    for file_path, arcname, ext in _iter_project_files(project_dir):
+        if ext in _STORED_EXTENSIONS:
+            zip_file.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+        else:
+            zip_file.write(file_path, arcname, compresslevel=1)
+        yield
+
+def stream_zip(project_id: str, file_paths: Dict[str, str]) -> Iterator[bytes]:
     """
-    Create a ZIP file containing the generated MERN project files in memory.
+    Build the project ZIP incrementally, yielding the archive bytes as each file is added.
+
+    The project directory is checked before the iterator is returned, so a missing
+    project still fails with an HTTP error instead of a truncated download.
 
     Args:
         project_id (str): The ID of the project to zip.
         file_paths (Dict[str, str]): Dictionary of file paths (e.g., {'frontend': 'path/to/App.js', 'backend': 'path/to/server.js'}).
-        buffer (io.BytesIO): In-memory buffer to write the ZIP file.
+
+    Returns:
+        Iterator[bytes]: Chunks of the ZIP archive, suitable for a StreamingResponse.
 
     Raises:
-        HTTPException: If the project directory or files are invalid.
+        HTTPException: If the project directory is invalid.
     """
-    project_dir = os.path.join("temp_projects", project_id)
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=400, detail=f"Project directory not found: {project_dir}")
+    project_dir = _project_dir(project_id)
 
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        # Walk through the project directory to include all files
-        for root, _, files in os.walk(project_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                # Calculate the relative path for the ZIP (e.g., 'client/App.js' instead of full path)
-                arcname = os.path.relpath(file_path, project_dir)
-                zip_file.write(file_path, arcname)
+    def chunks() -> Iterator[bytes]:
+        sink = _ChunkWriter()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+            for _ in _write_project(zip_file, project_dir):
+                yield from sink.drain()
+        # The central directory is written when the archive is closed
+        yield from sink.drain()
 
-    buffer.seek(0)
\ No newline at end of file
+    return chunks()
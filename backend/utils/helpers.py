@@ -1,7 +1,42 @@
 # backend/utils/helpers.py
 import uuid
 import os
-from typing import Dict
+from typing import Dict, Iterable
+
+# Constant file bodies are encoded once at import instead of on every generation
+_FRONTEND_SOURCE = b"import React from 'react';\nconst App = () => <div>Generated App</div>;\nexport default App;"
+_BACKEND_SOURCE = b'const express = require("express");\nconst app = express();\napp.get("/", (req, res) => res.send("Generated Backend"));\napp.listen(process.env.PORT || 4001);'  # Preview assigns PORT; 4001 when run by hand
+_PACKAGE_JSON = b'{"name": "generated-project", "scripts": {"start": "node server.js"}, "dependencies": {"express": "^4.17.1"}}'
+_VERCEL_JSON = b'{"version": 2, "builds": [{"src": "server.js", "use": "@vercel/node"}], "routes": [{"src": "/(.*)", "dest": "server.js"}]}'
+_README_PREFIX = b"# Generated MERN Project\n\nDescription: "
+_README_SUFFIX = b"\n\nRun `npm install` and `npm start` to start the server."
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+def _write_parts(path: str, parts: Iterable[bytes]) -> None:
+    """
+    Write byte chunks to a file with a single gather write where the OS supports it.
+
+    Args:
+        path (str): File to create or truncate.
+        parts (Iterable[bytes]): Chunks written in order.
+    """
+    parts = list(parts)
+    fd = os.open(path, _WRITE_FLAGS, 0o666)
+    try:
+        if hasattr(os, "writev"):
+            total = sum(len(part) for part in parts)
+            written = os.writev(fd, parts) if parts else 0
+        else:
+            # Windows has no writev
+            total = written = 0
+        if written < total or not hasattr(os, "writev"):
+            # Short writes are rare for regular files but possible; keep writing until done
+            view = memoryview(b"".join(parts))[written:]
+            while view:
+                view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 def generate_mern_code(description: str, project_id: str) -> Dict[str, str]:
     """
@@ -17,8 +52,7 @@ def generate_mern_code(description: str, project_id: str) -> Dict[str, str]:
     """
     project_dir = os.path.join("temp_projects", project_id)
     
-    # Create the project directory
-    os.makedirs(project_dir, exist_ok=True)
+    # Create the project directory; makedirs creates project_dir and client/ along the way
     os.makedirs(os.path.join(project_dir, "client", "src"), exist_ok=True)
     os.makedirs(os.path.join(project_dir, "client", "public", "images"), exist_ok=True)
     
@@ -33,18 +67,12 @@ def generate_mern_code(description: str, project_id: str) -> Dict[str, str]:
     }
     
     # Create minimal dummy files to simulate generation
-    with open(file_paths["frontend"], "w") as f:
-        f.write("import React from 'react';\nconst App = () => <div>Generated App</div>;\nexport default App;")
-    with open(file_paths["backend"], "w") as f:
-        f.write('const express = require("express");\nconst app = express();\napp.get("/", (req, res) => res.send("Generated Backend"));\napp.listen(4001);')  # Changed to port 4001
-    with open(file_paths["package"], "w") as f:
-        f.write('{"name": "generated-project", "scripts": {"start": "node server.js"}, "dependencies": {"express": "^4.17.1"}}')
-    with open(file_paths["vercel"], "w") as f:
-        f.write('{"version": 2, "builds": [{"src": "server.js", "use": "@vercel/node"}], "routes": [{"src": "/(.*)", "dest": "server.js"}]}')
-    with open(file_paths["readme"], "w") as f:
-        f.write(f"# Generated MERN Project\n\nDescription: {description}\n\nRun `npm install` and `npm start` to start the server.")
-    with open(file_paths["image"], "w") as f:
-        f.write("")  # Empty placeholder image file
+    _write_parts(file_paths["frontend"], (_FRONTEND_SOURCE,))
+    _write_parts(file_paths["backend"], (_BACKEND_SOURCE,))
+    _write_parts(file_paths["package"], (_PACKAGE_JSON,))
+    _write_parts(file_paths["vercel"], (_VERCEL_JSON,))
+    _write_parts(file_paths["readme"], (_README_PREFIX, description.encode("utf-8"), _README_SUFFIX))
+    _write_parts(file_paths["image"], ())  # Empty placeholder image file
 
     return file_paths
 